@@ -3,23 +3,49 @@ Library IL Aggregator - Aggregates library data from multiple library.org.il web
 
 This package provides functionality to combine checked out books and history
 from multiple Israeli public libraries into a single unified view.
+
+The public names below are imported on first access (PEP 562), so importing
+a submodule such as the CLIs doesn't load httpx and BeautifulSoup until they
+are needed.
 """
 
-from library_il_aggregator.aggregator import LibraryAccount, LibraryAggregator
-from library_il_aggregator.models import (
-    AggregatedBooks,
-    AggregatedHistory,
-    CombinedBookDetails,
-    CombinedSearchResult,
-    CombinedSearchResults,
-    LibrarySearchInfo,
-)
-from library_il_aggregator.search import SearchAggregator
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from library_il_aggregator.aggregator import LibraryAccount, LibraryAggregator
+    from library_il_aggregator.models import (
+        AggregatedBooks,
+        AggregatedBooksAndHistory,
+        AggregatedHistory,
+        CombinedBookDetails,
+        CombinedSearchResult,
+        CombinedSearchResults,
+        LibrarySearchInfo,
+    )
+    from library_il_aggregator.search import SearchAggregator
+
+# Public name -> module that defines it
+_EXPORTS = {
+    "LibraryAccount": "library_il_aggregator.aggregator",
+    "LibraryAggregator": "library_il_aggregator.aggregator",
+    "AggregatedBooks": "library_il_aggregator.models",
+    "AggregatedBooksAndHistory": "library_il_aggregator.models",
+    "AggregatedHistory": "library_il_aggregator.models",
+    "CombinedBookDetails": "library_il_aggregator.models",
+    "CombinedSearchResult": "library_il_aggregator.models",
+    "CombinedSearchResults": "library_il_aggregator.models",
+    "LibrarySearchInfo": "library_il_aggregator.models",
+    "SearchAggregator": "library_il_aggregator.search",
+}
 
 __all__ = [
     "LibraryAccount",
     "LibraryAggregator",
     "AggregatedBooks",
+    "AggregatedBooksAndHistory",
     "AggregatedHistory",
     "CombinedBookDetails",
     "CombinedSearchResult",
@@ -27,3 +53,18 @@ __all__ = [
     "LibrarySearchInfo",
     "SearchAggregator",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name from its module on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the public names, including ones not imported yet."""
+    return sorted(set(globals()) | set(__all__))
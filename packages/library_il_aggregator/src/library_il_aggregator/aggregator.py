@@ -3,15 +3,54 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
-from typing import Optional
+import hashlib
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
 
-from library_il_client import LibraryClient, LoginError
+import httpx
+from library_il_client import (
+    CheckedOutBook,
+    HistoryItem,
+    LibraryClient,
+    LibraryClientError,
+    LoginError,
+    SessionExpiredError,
+)
 
-from library_il_aggregator.models import AggregatedBooks, AggregatedHistory
+from library_il_aggregator.limits import DEFAULT_MAX_CONCURRENCY_PER_SLUG
+from library_il_aggregator.models import (
+    AggregatedBooks,
+    AggregatedBooksAndHistory,
+    AggregatedHistory,
+)
 
+# Items fetched from a single account, plus an error message if the fetch failed
+_Fetched = tuple[list, Optional[str]]
 
-@dataclass
+# One account's (account_id, books, history) results; None for views not requested
+_AccountFetched = tuple[str, Optional[_Fetched], Optional[_Fetched]]
+
+_T = TypeVar("_T")
+
+logger = logging.getLogger(__name__)
+
+# Errors from talking to a library that are reported per account instead of
+# raised; anything else is a bug and propagates
+_ACCOUNT_ERRORS = (httpx.HTTPError, LibraryClientError)
+
+# Retry policy for transient network errors (connection failures, 429, 5xx)
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.25  # seconds, doubled on each attempt
+
+
+@dataclass(frozen=True, slots=True)
 class LibraryAccount:
     """
     Represents credentials for a library account.
@@ -21,18 +60,17 @@ class LibraryAccount:
         username: Username (typically Teudat Zehut)
         password: Password for the account
         label: Optional label to distinguish multiple accounts at the same library
+        account_id: Unique identifier for this account (slug + label or username)
     """
     slug: str
     username: str
     password: str
     label: Optional[str] = None
+    account_id: str = field(init=False, repr=False, compare=False)
     
-    @property
-    def account_id(self) -> str:
-        """Unique identifier for this account (slug + username or label)."""
-        if self.label:
-            return f"{self.slug}:{self.label}"
-        return f"{self.slug}:{self.username}"
+    def __post_init__(self) -> None:
+        # Computed once, since the aggregator reads it on every account access
+        object.__setattr__(self, "account_id", f"{self.slug}:{self.label or self.username}")
 
 
 class LibraryAggregator:
@@ -46,6 +84,27 @@ class LibraryAggregator:
     - Different credentials per library
     - Parallel fetching for improved performance
     
+    All clients share one connection pool, so accounts at the same library
+    reuse open connections instead of each paying for its own TLS handshake.
+    
+    If ``session_cache_dir`` is set, session cookies are saved there after
+    each login and reused by later runs, skipping the login round-trip. An
+    expired saved session is detected on first use and replaced by a fresh
+    login.
+    
+    Requests to the same library are capped at ``max_concurrency_per_slug``
+    at a time, so many accounts at one library don't overwhelm its website.
+    Requests to different libraries still run fully in parallel.
+    
+    If ``cache_ttl`` is positive, results of the ``get_all_*`` methods are
+    reused for that many seconds, so back-to-back calls (e.g. several views
+    of the same data) share one round of network requests. A cached
+    get_all_books_and_history() result also answers the single-view
+    methods. Results with errors are not cached, so the next call retries
+    the failed accounts. Each call returns its own lists, but the book and
+    history objects in them are shared. Call ``invalidate_cache()`` to force
+    a refresh.
+    
     Example with multiple accounts:
         >>> accounts = [
         ...     LibraryAccount("shemesh", "user1_tz", "user1_pass", label="parent"),
@@ -68,16 +127,39 @@ class LibraryAggregator:
         ...     books = await aggregator.get_all_checked_out_books()
     """
     
-    def __init__(self, accounts: list[LibraryAccount]):
+    def __init__(
+        self,
+        accounts: list[LibraryAccount],
+        max_concurrency_per_slug: int = DEFAULT_MAX_CONCURRENCY_PER_SLUG,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        session_cache_dir: Optional[Path | str] = None,
+        cache_ttl: float = 0.0,
+    ):
         """
         Initialize the aggregator with library accounts.
         
         Args:
             accounts: List of LibraryAccount objects with credentials for each library/account.
+            max_concurrency_per_slug: Maximum number of concurrent requests to a single library.
+            transport: Optional HTTP transport (connection pool) shared by all clients.
+                       If not provided, the aggregator creates one and closes it in close().
+            session_cache_dir: Optional directory for saved session cookies, keyed by account.
+            cache_ttl: Seconds to reuse results of the get_all_* methods. 0 disables caching.
         """
         self.accounts = accounts
+        self.max_concurrency_per_slug = max_concurrency_per_slug
         self._clients: dict[str, LibraryClient] = {}  # account_id -> client
-        self._logged_in: set[str] = set()  # account_ids that are logged in
+        # account_id -> (account, client), only for accounts that are logged in
+        self._logged_in_clients: dict[str, tuple[LibraryAccount, LibraryClient]] = {}
+        self._slug_semaphores: dict[str, asyncio.Semaphore] = {}  # slug -> semaphore
+        # account_id -> lock, so concurrent logins for one account happen once
+        self._login_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._transport = transport  # Created lazily if not provided
+        self._owns_transport = transport is None
+        self.session_cache_dir = Path(session_cache_dir).expanduser() if session_cache_dir else None
+        self.cache_ttl = cache_ttl
+        # (books, history, logged-in account ids) -> (fetch time, result)
+        self._cache: dict[tuple, tuple[float, AggregatedBooksAndHistory]] = {}
     
     @classmethod
     def from_slugs(
@@ -121,37 +203,137 @@ class LibraryAggregator:
         if close_tasks:
             await asyncio.gather(*close_tasks, return_exceptions=True)
         self._clients.clear()
-        self._logged_in.clear()
+        self._logged_in_clients.clear()
+        self._login_locks.clear()
+        self._cache.clear()
+        
+        # Close the shared connection pool only if we created it
+        if self._owns_transport and self._transport is not None:
+            await self._transport.aclose()
+            self._transport = None
+    
+    def _get_transport(self) -> httpx.AsyncBaseTransport:
+        """Get the connection pool shared by all clients, creating it if needed."""
+        if self._transport is None:
+            self._transport = httpx.AsyncHTTPTransport()
+        return self._transport
     
     def _get_or_create_client(self, account: LibraryAccount) -> LibraryClient:
         """Get or create a client for the specified account."""
-        account_id = account.account_id
-        if account_id not in self._clients:
-            self._clients[account_id] = LibraryClient(
+        client = self._clients.get(account.account_id)
+        if client is None:
+            client = LibraryClient(
                 account.slug,
                 account.username,
                 account.password,
+                transport=self._get_transport(),
             )
-        return self._clients[account_id]
+            self._clients[account.account_id] = client
+        return client
+    
+    def _slug_semaphore(self, slug: str) -> asyncio.Semaphore:
+        """Get the semaphore limiting concurrent requests to a library."""
+        semaphore = self._slug_semaphores.get(slug)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_slug)
+            self._slug_semaphores[slug] = semaphore
+        return semaphore
+    
+    def _session_path(self, account: LibraryAccount) -> Optional[Path]:
+        """Get the saved-session file for an account, if session caching is enabled."""
+        if self.session_cache_dir is None:
+            return None
+        # Hash the account id so usernames don't appear in file names
+        digest = hashlib.sha256(account.account_id.encode()).hexdigest()[:16]
+        return self.session_cache_dir / f"{account.slug}-{digest}.json"
+    
+    async def _limited(self, slug: str, fetch: Callable[[], Awaitable[_T]]) -> _T:
+        """Call fetch while holding the library's concurrency slot."""
+        async with self._slug_semaphore(slug):
+            return await fetch()
+    
+    async def _login_client(self, account: LibraryAccount, client: LibraryClient) -> None:
+        """Login a client over the network and save its session if caching is enabled."""
+        await _with_retry(lambda: self._limited(
+            account.slug,
+            lambda: client.login(account.username, account.password),
+        ))
+        
+        session_path = self._session_path(account)
+        if session_path is not None:
+            # Saving only speeds up later runs; the login itself already succeeded
+            try:
+                session_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+                client.save_session(session_path)
+            except OSError as e:
+                logger.warning("Could not save session for %s: %s", account.account_id, e)
     
     async def login(self, account: LibraryAccount) -> bool:
         """
         Login to a specific library account.
         
+        If the account is already logged in, or a saved session exists for
+        it, no request is made. Concurrent calls for the same account wait
+        for the first one instead of logging in again.
+        
         Args:
             account: The LibraryAccount to login to.
             
         Returns:
             True if login succeeded, False otherwise.
         """
-        client = self._get_or_create_client(account)
+        async with self._login_locks[account.account_id]:
+            if account.account_id in self._logged_in_clients:
+                return True
+            
+            client = self._get_or_create_client(account)
+            
+            session_path = self._session_path(account)
+            if session_path is not None and client.load_session(session_path):
+                self._logged_in_clients[account.account_id] = (account, client)
+                return True
+            
+            try:
+                await self._login_client(account, client)
+                self._logged_in_clients[account.account_id] = (account, client)
+                return True
+            except LoginError:
+                return False
+    
+    async def _try_login(self, account: LibraryAccount) -> bool:
+        """Login to an account, treating network and client errors as a failed login."""
         try:
-            await client.login(account.username, account.password)
-            self._logged_in.add(account.account_id)
-            return True
-        except LoginError:
+            return await self.login(account)
+        except _ACCOUNT_ERRORS:
             return False
     
+    async def _call(
+        self,
+        account: LibraryAccount,
+        client: LibraryClient,
+        fetch: Callable[[], Awaitable[_T]],
+    ) -> _T:
+        """
+        Call a client data method with retries.
+        
+        Transient network errors are retried with backoff, and an expired
+        session triggers one fresh login before trying again. Concurrent
+        fetches that find the same session expired share that login.
+        """
+        try:
+            return await _with_retry(lambda: self._limited(account.slug, fetch))
+        except SessionExpiredError:
+            async with self._login_locks[account.account_id]:
+                # Another fetch may have logged in again while this one waited;
+                # the client stays logged in if its session was replaced
+                if not client.is_logged_in:
+                    await self._login_client(account, client)
+            return await _with_retry(lambda: self._limited(account.slug, fetch))
+    
+    def invalidate_cache(self) -> None:
+        """Discard cached results so the next get_all_* call fetches fresh data."""
+        self._cache.clear()
+    
     async def login_all(self) -> dict[str, bool]:
         """
         Login to all configured library accounts in parallel.
@@ -159,59 +341,76 @@ class LibraryAggregator:
         Returns:
             Dictionary mapping account_id to login success status.
         """
-        # Create login tasks for all accounts in parallel
-        login_tasks = [self.login(account) for account in self.accounts]
-        results = await asyncio.gather(*login_tasks, return_exceptions=True)
-        
-        # Build results dictionary
+        # Login to all accounts in parallel
+        async with _task_group() as tg:
+            tasks = [tg.create_task(self._try_login(account)) for account in self.accounts]
         return {
-            account.account_id: result if not isinstance(result, Exception) else False
-            for account, result in zip(self.accounts, results)
+            account.account_id: task.result()
+            for account, task in zip(self.accounts, tasks)
         }
     
-    async def get_all_checked_out_books(self) -> AggregatedBooks:
+    async def login_and_fetch_all_books(self) -> AggregatedBooks:
         """
-        Get checked out books from all logged-in library accounts in parallel.
+        Login to all configured accounts and fetch their checked out books.
+        
+        Each account's fetch starts as soon as its own login completes,
+        instead of waiting for every account to log in first. This is the
+        fastest way to get books from a fresh aggregator: the total time is
+        the slowest login plus fetch for a single account, rather than the
+        slowest login plus the slowest fetch.
+        
+        Accounts that fail to log in are left out of the result, as with
+        login_all() followed by get_all_checked_out_books().
         
         Returns:
-            AggregatedBooks containing books from all accounts.
+            AggregatedBooks containing books from all accounts that logged in.
         """
-        result = AggregatedBooks(libraries=list(self._logged_in))
+        combined = await self.login_and_fetch_all(books=True, history=False)
+        return combined.books
+    
+    async def login_and_fetch_all(
+        self,
+        books: bool = True,
+        history: bool = True,
+    ) -> AggregatedBooksAndHistory:
+        """
+        Login to all configured accounts and fetch the requested views.
         
-        # Create tasks to fetch books from all accounts in parallel
-        async def fetch_books_for_account(account: LibraryAccount) -> tuple[str, list, Optional[str]]:
-            account_id = account.account_id
-            if account_id not in self._logged_in:
-                return account_id, [], None
-            
-            client = self._clients.get(account_id)
-            if not client:
-                return account_id, [], None
+        Like login_and_fetch_all_books(), each account's fetches start as
+        soon as its own login completes. Views that aren't requested are
+        left empty.
+        
+        Accounts that fail to log in are left out of the result; their
+        account_ids are missing from the libraries lists.
+        
+        Args:
+            books: Whether to fetch checked out books.
+            history: Whether to fetch checkout history.
             
-            try:
-                books = await client.get_checked_out_books()
-                # Attach account_id to each book for proper labeling
-                for book in books:
-                    book.account_id = account_id
-                return account_id, books, None
-            except Exception as e:
-                return account_id, [], str(e)
+        Returns:
+            AggregatedBooksAndHistory for all accounts that logged in.
+        """
+        async def login_and_fetch(account: LibraryAccount) -> Optional[_AccountFetched]:
+            if not await self._try_login(account):
+                return None
+            client = self._get_or_create_client(account)
+            return await self._fetch_account(account, client, books, history)
         
-        # Fetch from all accounts in parallel
-        tasks = [fetch_books_for_account(account) for account in self.accounts]
-        results_list = await asyncio.gather(*tasks, return_exceptions=True)
+        async with _task_group() as tg:
+            tasks = [tg.create_task(login_and_fetch(account)) for account in self.accounts]
         
-        # Process results
-        for result_item in results_list:
-            if isinstance(result_item, Exception):
-                continue
-            account_id, books, error = result_item
-            if error:
-                result.errors[account_id] = error
-            else:
-                result.books.extend(books)
+        fetched = [task.result() for task in tasks if task.result() is not None]
+        return _combine([account_id for account_id, _, _ in fetched], fetched)
+    
+    async def get_all_checked_out_books(self) -> AggregatedBooks:
+        """
+        Get checked out books from all logged-in library accounts in parallel.
         
-        return result
+        Returns:
+            AggregatedBooks containing books from all accounts.
+        """
+        combined = await self._fetch_all(books=True, history=False)
+        return combined.books
     
     async def get_all_checkout_history(self) -> AggregatedHistory:
         """
@@ -220,39 +419,227 @@ class LibraryAggregator:
         Returns:
             AggregatedHistory containing history from all accounts.
         """
-        result = AggregatedHistory(libraries=list(self._logged_in))
+        combined = await self._fetch_all(books=False, history=True)
+        return combined.history
+    
+    async def get_all_books_and_history(self) -> AggregatedBooksAndHistory:
+        """
+        Get checked out books and checkout history from all logged-in accounts.
         
-        # Create tasks to fetch history from all accounts in parallel
-        async def fetch_history_for_account(account: LibraryAccount) -> tuple[str, list, Optional[str]]:
-            account_id = account.account_id
-            if account_id not in self._logged_in:
-                return account_id, [], None
-            
-            client = self._clients.get(account_id)
-            if not client:
-                return account_id, [], None
-            
-            try:
-                history = await client.get_checkout_history()
-                # Attach account_id to each history item for proper labeling
-                for item in history.items:
-                    item.account_id = account_id
-                return account_id, history.items, None
-            except Exception as e:
-                return account_id, [], str(e)
+        Both requests for each account are issued together, and all accounts
+        are fetched in parallel, so callers that need both views pay for a
+        single round of network calls instead of two.
+        
+        Returns:
+            AggregatedBooksAndHistory containing books and history from all accounts.
+        """
+        return await self._fetch_all(books=True, history=True)
+    
+    async def iter_checked_out_books(
+        self,
+    ) -> AsyncIterator[tuple[str, list[CheckedOutBook], Optional[str]]]:
+        """
+        Yield checked out books from each logged-in account as soon as they arrive.
         
-        # Fetch from all accounts in parallel
-        tasks = [fetch_history_for_account(account) for account in self.accounts]
-        results_list = await asyncio.gather(*tasks, return_exceptions=True)
+        Accounts are fetched in parallel, and each account's batch is yielded
+        when its fetch completes, so callers can start processing fast
+        libraries without waiting for the slowest one.
         
-        # Process results
-        for result_item in results_list:
-            if isinstance(result_item, Exception):
-                continue
-            account_id, items, error = result_item
-            if error:
-                result.errors[account_id] = error
-            else:
-                result.items.extend(items)
+        Yields:
+            Tuples of (account_id, books, error). On failure, books is empty
+            and error holds the error message.
+        """
+        logged_in = list(self._logged_in_clients.values())
+        async for account_id, books_result, _ in self._iter_accounts(logged_in, books=True, history=False):
+            if books_result is not None:
+                items, error = books_result
+                yield account_id, items, error
+    
+    async def _fetch_all(self, books: bool, history: bool) -> AggregatedBooksAndHistory:
+        """Fetch the requested views from all logged-in accounts, using the cache if enabled."""
+        if self.cache_ttl <= 0:
+            return await self._fetch_all_uncached(books, history)
+        
+        # Logging in more accounts changes the key, so stale subsets aren't reused
+        account_ids = frozenset(self._logged_in_clients)
+        key = (books, history, account_ids)
+        now = time.monotonic()
+        # A cached fetch of both views also answers a request for just one
+        for cache_key in (key, (True, True, account_ids)):
+            cached = self._cache.get(cache_key)
+            if cached is not None and now - cached[0] < self.cache_ttl:
+                return _copy(cached[1])
         
+        result = await self._fetch_all_uncached(books, history)
+        # Failures aren't cached, so the next call tries those accounts again
+        if not result.books.errors and not result.history.errors:
+            self._cache[key] = (now, result)
+            return _copy(result)
         return result
+    
+    async def _fetch_all_uncached(self, books: bool, history: bool) -> AggregatedBooksAndHistory:
+        """Fetch the requested views from all logged-in accounts in parallel."""
+        # Snapshot the logged-in accounts once, so a login finishing mid-fetch
+        # can't make the reported libraries disagree with what was fetched
+        logged_in = list(self._logged_in_clients.values())
+        # Results are combined in account order, however the fetches finish
+        async with _task_group() as tg:
+            tasks = [
+                tg.create_task(self._fetch_account(account, client, books, history))
+                for account, client in logged_in
+            ]
+        fetched = [task.result() for task in tasks]
+        return _combine([account.account_id for account, _ in logged_in], fetched)
+    
+    async def _iter_accounts(
+        self,
+        logged_in: list[tuple[LibraryAccount, LibraryClient]],
+        books: bool,
+        history: bool,
+    ) -> AsyncIterator[_AccountFetched]:
+        """Fetch the requested views from the given accounts, yielding in completion order."""
+        # Fetch from all accounts in parallel. A TaskGroup can't be held
+        # open across yields, so tasks are cancelled by hand instead
+        tasks = [
+            asyncio.ensure_future(self._fetch_account(account, client, books, history))
+            for account, client in logged_in
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Don't leave fetches running if the caller stops early
+            for task in tasks:
+                task.cancel()
+    
+    async def _fetch_account(
+        self,
+        account: LibraryAccount,
+        client: LibraryClient,
+        books: bool,
+        history: bool,
+    ) -> _AccountFetched:
+        """Fetch the requested views for one account, issuing both requests together."""
+        async with _task_group() as tg:
+            books_task = tg.create_task(self._fetch_books(account, client)) if books else None
+            history_task = tg.create_task(self._fetch_history(account, client)) if history else None
+        return (
+            account.account_id,
+            books_task.result() if books_task else None,
+            history_task.result() if history_task else None,
+        )
+    
+    async def _fetch_books(self, account: LibraryAccount, client: LibraryClient) -> _Fetched:
+        """Fetch checked out books for one account as (books, error)."""
+        try:
+            books = await self._call(account, client, client.get_checked_out_books)
+        except _ACCOUNT_ERRORS as e:
+            return [], str(e)
+        # Attach account_id to each book for proper labeling
+        for book in books:
+            book.account_id = account.account_id
+        return books, None
+    
+    async def _fetch_history(self, account: LibraryAccount, client: LibraryClient) -> _Fetched:
+        """Fetch checkout history for one account as (items, error)."""
+        try:
+            history = await self._call(account, client, client.get_checkout_history)
+        except _ACCOUNT_ERRORS as e:
+            return [], str(e)
+        # Attach account_id to each history item for proper labeling
+        for item in history.items:
+            item.account_id = account.account_id
+        return history.items, None
+
+
+def _combine(account_ids: list[str], fetched: list[_AccountFetched]) -> AggregatedBooksAndHistory:
+    """Merge per-account fetch results into aggregated books and history."""
+    result = AggregatedBooksAndHistory(
+        books=AggregatedBooks(libraries=account_ids),
+        history=AggregatedHistory(libraries=account_ids.copy()),
+    )
+    
+    # Collect the batches so the final lists are built in one pass
+    book_batches: list[list[CheckedOutBook]] = []
+    history_batches: list[list[HistoryItem]] = []
+    for account_id, books_result, history_result in fetched:
+        if books_result is not None:
+            items, error = books_result
+            if error:
+                result.books.errors[account_id] = error
+            else:
+                book_batches.append(items)
+        if history_result is not None:
+            items, error = history_result
+            if error:
+                result.history.errors[account_id] = error
+            else:
+                history_batches.append(items)
+    
+    result.books.books = list(chain.from_iterable(book_batches))
+    result.history.items = list(chain.from_iterable(history_batches))
+    return result
+
+
+@asynccontextmanager
+async def _task_group() -> AsyncIterator[asyncio.TaskGroup]:
+    """
+    Open a TaskGroup that raises the first task error itself.
+    
+    A TaskGroup wraps errors in an ExceptionGroup, but callers expect the
+    exception a plain await would raise, as they got from asyncio.gather().
+    """
+    try:
+        async with asyncio.TaskGroup() as tg:
+            yield tg
+    except BaseExceptionGroup as group:
+        error: BaseException = group
+        while isinstance(error, BaseExceptionGroup):
+            error = error.exceptions[0]
+        raise error
+
+
+def _copy(result: AggregatedBooksAndHistory) -> AggregatedBooksAndHistory:
+    """Copy a cached result, so callers can modify its lists without affecting the cache."""
+    return AggregatedBooksAndHistory(
+        books=AggregatedBooks(
+            books=result.books.books.copy(),
+            libraries=result.books.libraries.copy(),
+            errors=result.books.errors.copy(),
+        ),
+        history=AggregatedHistory(
+            items=result.history.items.copy(),
+            libraries=result.history.libraries.copy(),
+            errors=result.history.errors.copy(),
+        ),
+    )
+
+
+def _is_transient(error: Exception) -> bool:
+    """Check if a request error is worth retrying."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+async def _with_retry(
+    fetch: Callable[[], Awaitable[_T]],
+    attempts: int = RETRY_ATTEMPTS,
+    base_delay: float = RETRY_BASE_DELAY,
+) -> _T:
+    """
+    Call fetch, retrying transient network errors with exponential backoff.
+    
+    Other errors, such as LoginError, are raised immediately. The error from
+    the final attempt is raised if all attempts fail.
+    """
+    for attempt in range(attempts - 1):
+        try:
+            return await fetch()
+        except httpx.HTTPError as e:
+            if not _is_transient(e):
+                raise
+        # Back off with jitter so parallel retries don't hit the site together
+        await asyncio.sleep(base_delay * 2 ** attempt + random.uniform(0, base_delay))
+    return await fetch()
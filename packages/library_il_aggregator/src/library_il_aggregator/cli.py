@@ -3,20 +3,63 @@
 from __future__ import annotations
 
 import argparse
-import asyncio
-import json
 import os
 import sys
 from datetime import date
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
 
-from tabulate import tabulate
+from library_il_aggregator.cli_utils import (
+    TABLE_FORMATS,
+    load_json_file,
+    render_github_table,
+    render_tsv_table,
+    run_async,
+    truncate,
+)
+from library_il_aggregator.limits import DEFAULT_MAX_CONCURRENCY_PER_SLUG
 
-from library_il_aggregator import LibraryAccount, LibraryAggregator
+if TYPE_CHECKING:
+    from library_il_client import CheckedOutBook, HistoryItem
+
+# Display truncation constants
+MAX_LABEL_LEN = 18
+MAX_TITLE_LEN = 58
+MAX_AUTHOR_LEN = 28
+
+
+def write_section(
+    title: str,
+    headers: list[str],
+    rows: list[tuple[str, ...]],
+    total_line: str,
+    empty_message: str,
+    render_table: Callable[[Sequence[str], Sequence[Sequence[str]]], str],
+) -> None:
+    """
+    Write one report section to stdout in a single call.
+    
+    Args:
+        title: Section heading.
+        headers: Table column headers.
+        rows: Table rows, already formatted and truncated.
+        total_line: Summary line shown above the table.
+        empty_message: Shown instead of the summary and table if there are no rows.
+        render_table: Function rendering headers and rows as a table.
+    """
+    out = [f"## {title}", ""]
+    if not rows:
+        out.append(empty_message)
+    else:
+        out.append(total_line)
+        out.append("")
+        out.append(render_table(headers, rows))
+    out.append("")
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def main() -> int:
     """Main entry point for the CLI."""
-    return asyncio.run(async_main())
+    return run_async(async_main)
 
 
 async def async_main() -> int:
@@ -37,12 +80,24 @@ Examples:
   # Use a JSON config file for multiple accounts
   library-il-aggregate --config accounts.json --all
   
+  # Allow more parallel requests to each library website
+  library-il-aggregate --config accounts.json --all --jobs 8
+  
+  # Tab-separated tables for scripts
+  library-il-aggregate --config accounts.json --history --format tsv
+  
   # Config file format (accounts.json):
   # [
   #   {"slug": "shemesh", "username": "tz1", "password": "pass1", "label": "parent"},
   #   {"slug": "shemesh", "username": "tz2", "password": "pass2", "label": "child"},
   #   {"slug": "betshemesh", "username": "tz1", "password": "pass1"}
   # ]
+
+Performance:
+  Run time is dominated by waiting on the library websites, so all accounts
+  are queried in parallel. --jobs caps the parallel requests sent to each
+  library website. Higher values speed up runs with many accounts at the
+  same library, but may get requests throttled by the website.
 """,
     )
     
@@ -97,9 +152,36 @@ Examples:
         default=0,
         help="Limit number of results (0 = no limit)",
     )
+    output_group.add_argument(
+        "--format",
+        "-f",
+        choices=TABLE_FORMATS,
+        default="github",
+        help="Table format: github (Markdown, default) or tsv (tab-separated, for scripts)",
+    )
+    
+    # Network options
+    network_group = parser.add_argument_group("Network Options")
+    network_group.add_argument(
+        "--max-concurrency",
+        "--jobs",
+        "-j",
+        dest="max_concurrency",
+        metavar="N",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY_PER_SLUG,
+        help=f"Maximum concurrent requests to each library website (default {DEFAULT_MAX_CONCURRENCY_PER_SLUG})",
+    )
     
     args = parser.parse_args()
     
+    if args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
+    
+    # Imported after argument parsing so --help and usage errors don't load
+    # the HTTP client stack
+    from library_il_aggregator import LibraryAccount, LibraryAggregator
+    
     # Default to showing all if nothing specified
     if not args.books and not args.history and not args.all:
         args.all = True
@@ -108,33 +190,35 @@ Examples:
         args.books = True
         args.history = True
     
+    # Shared credentials for --libraries and the default libraries
+    username = args.username or os.environ.get("TEUDAT_ZEHUT", "")
+    password = args.password or os.environ.get("LIBRARY_PASSWORD", "")
+    
     # Build accounts list
     accounts: list[LibraryAccount] = []
     
     if args.config:
         # Load from config file
         try:
-            with open(args.config) as f:
-                config_data = json.load(f)
+            config_data = load_json_file(args.config)
             
-            for item in config_data:
-                accounts.append(LibraryAccount(
+            accounts = [
+                LibraryAccount(
                     slug=item["slug"],
                     username=item["username"],
                     password=item["password"],
                     label=item.get("label"),
-                ))
+                )
+                for item in config_data
+            ]
         except FileNotFoundError:
             print(f"Error: Config file not found: {args.config}", file=sys.stderr)
             return 1
-        except (json.JSONDecodeError, KeyError) as e:
+        except (ValueError, KeyError) as e:
             print(f"Error: Invalid config file: {e}", file=sys.stderr)
             return 1
     elif args.libraries:
         # Use --libraries with shared credentials
-        username = args.username or os.environ.get("TEUDAT_ZEHUT", "")
-        password = args.password or os.environ.get("LIBRARY_PASSWORD", "")
-        
         if not username:
             print("Error: Username required. Use --username or set TEUDAT_ZEHUT.", file=sys.stderr)
             return 1
@@ -142,25 +226,20 @@ Examples:
             print("Error: Password required. Use --password or set LIBRARY_PASSWORD.", file=sys.stderr)
             return 1
         
-        for slug in args.libraries:
-            accounts.append(LibraryAccount(
-                slug=slug,
-                username=username,
-                password=password,
-            ))
+        accounts = [
+            LibraryAccount(slug=slug, username=username, password=password)
+            for slug in args.libraries
+        ]
     else:
         # Default to shemesh and betshemesh with env credentials
-        username = args.username or os.environ.get("TEUDAT_ZEHUT", "")
-        password = args.password or os.environ.get("LIBRARY_PASSWORD", "")
-        
         if not username or not password:
             print("Error: Credentials required. Use --config, --libraries with credentials,", file=sys.stderr)
             print("       or set TEUDAT_ZEHUT and LIBRARY_PASSWORD environment variables.", file=sys.stderr)
             return 1
         
         accounts = [
-            LibraryAccount(slug="shemesh", username=username, password=password),
-            LibraryAccount(slug="betshemesh", username=username, password=password),
+            LibraryAccount(slug=slug, username=username, password=password)
+            for slug in ("shemesh", "betshemesh")
         ]
     
     if not accounts:
@@ -176,140 +255,105 @@ Examples:
         else:
             label_map[account.account_id] = f"{account.slug}:{account.username}"
     
-    async with LibraryAggregator(accounts) as aggregator:
-        # Login to all accounts
+    # Table labels are truncated once per account rather than once per row
+    table_labels = {
+        account_id: truncate(label, MAX_LABEL_LEN)
+        for account_id, label in label_map.items()
+    }
+    
+    # Fallback labels for items without a known account_id: first account per library
+    slug_to_label: dict[str, str] = {}
+    for account in accounts:
+        slug_to_label.setdefault(account.slug, table_labels[account.account_id])
+    
+    def display_label(item: CheckedOutBook | HistoryItem) -> str:
+        """Get the truncated table label for the account a book or history item belongs to."""
+        return (
+            table_labels.get(item.account_id)
+            or slug_to_label.get(item.library_slug)
+            or truncate(item.library_slug, MAX_LABEL_LEN)
+        )
+    
+    # Many items share a due or return date, so format each date only once
+    date_strs: dict[date, str] = {}
+    
+    def format_date(value: Optional[date]) -> str:
+        """Format a table date, or 'N/A' if there is none."""
+        if value is None:
+            return "N/A"
+        text = date_strs.get(value)
+        if text is None:
+            text = date_strs[value] = str(value)
+        return text
+    
+    render_table = render_tsv_table if args.format == "tsv" else render_github_table
+    
+    async with LibraryAggregator(accounts, max_concurrency_per_slug=args.max_concurrency) as aggregator:
+        # Login and fetch everything requested in one parallel pass; each
+        # account's fetch starts as soon as its own login completes
         print(f"Logging in to {len(accounts)} account(s)...")
-        login_results = await aggregator.login_all()
+        combined = await aggregator.login_and_fetch_all(books=args.books, history=args.history)
+        all_books, all_history = combined.books, combined.history
         
-        for account_id, success in login_results.items():
-            status = "✓" if success else "✗"
+        # Accounts that failed to log in are missing from the results
+        logged_in = set(all_books.libraries)
+        for account_id in dict.fromkeys(account.account_id for account in accounts):
+            status = "✓" if account_id in logged_in else "✗"
             label = label_map.get(account_id, account_id)
             print(f"  {status} {label}")
         
-        if not any(login_results.values()):
+        if not logged_in:
             print("Error: Failed to login to any account", file=sys.stderr)
             return 1
         
         print()
         
+        def warn_errors(errors: dict[str, str]) -> None:
+            """Print per-account fetch errors to stderr."""
+            for account_id, error in errors.items():
+                label = label_map.get(account_id, account_id)
+                print(f"  Warning: {label}: {error}", file=sys.stderr)
+        
         # Show checked out books
         if args.books:
-            print("## Currently Checked Out Books")
-            print()
-            
-            all_books = await aggregator.get_all_checked_out_books()
-            
-            if all_books.errors:
-                for account_id, error in all_books.errors.items():
-                    label = label_map.get(account_id, account_id)
-                    print(f"  Warning: {label}: {error}", file=sys.stderr)
-            
-            books = all_books.sorted_by_due_date()
-            if args.limit > 0:
-                books = books[:args.limit]
-            
-            if not books:
-                print("No books currently checked out.")
-            else:
-                print(f"**Total: {all_books.total_count} books**")
-                print()
-                
-                # Prepare table data
-                table_data = []
-                for book in books:
-                    # Get the label using the account_id attached to the book
-                    library_label = book.library_slug
-                    if hasattr(book, 'account_id'):
-                        library_label = label_map.get(book.account_id, book.library_slug)
-                    else:
-                        # Fallback to slug matching for backwards compatibility
-                        for account in accounts:
-                            if account.slug == book.library_slug:
-                                library_label = label_map.get(account.account_id, book.library_slug)
-                                break
-                    
-                    # Truncate long library labels
-                    if len(library_label) > 18:
-                        library_label = library_label[:15] + "..."
-                    
-                    # Truncate long titles
-                    title = book.title
-                    if len(title) > 58:
-                        title = title[:55] + "..."
-                    
-                    due_date_str = str(book.due_date) if book.due_date else "N/A"
-                    days_str = ""
-                    if book.due_date:
-                        days_remaining = (book.due_date - date.today()).days
-                        days_str = str(days_remaining)
-                    else:
-                        days_str = "N/A"
-                    
-                    table_data.append([library_label, title, due_date_str, days_str])
-                
-                headers = ["Library", "Title", "Due Date", "Days Remaining"]
-                print(tabulate(table_data, headers=headers, tablefmt="github"))
-            
-            print()
+            warn_errors(all_books.errors)
+            today = date.today()
+            write_section(
+                "Currently Checked Out Books",
+                ["Library", "Title", "Due Date", "Days Remaining"],
+                [
+                    (
+                        display_label(book),
+                        truncate(book.title, MAX_TITLE_LEN),
+                        format_date(book.due_date),
+                        str((book.due_date - today).days) if book.due_date else "N/A",
+                    )
+                    for book in all_books.sorted_by_due_date(limit=args.limit)
+                ],
+                total_line=f"**Total: {all_books.total_count} books**",
+                empty_message="No books currently checked out.",
+                render_table=render_table,
+            )
         
         # Show checkout history
         if args.history:
-            print("## Checkout History")
-            print()
-            
-            all_history = await aggregator.get_all_checkout_history()
-            
-            if all_history.errors:
-                for account_id, error in all_history.errors.items():
-                    label = label_map.get(account_id, account_id)
-                    print(f"  Warning: {label}: {error}", file=sys.stderr)
-            
-            items = all_history.sorted_by_return_date()
-            if args.limit > 0:
-                items = items[:args.limit]
-            
-            if not items:
-                print("No checkout history found.")
-            else:
-                print(f"**Total: {all_history.total_count} items**")
-                print()
-                
-                # Prepare table data
-                table_data = []
-                for item in items:
-                    # Get the label using the account_id attached to the item
-                    library_label = item.library_slug
-                    if hasattr(item, 'account_id'):
-                        library_label = label_map.get(item.account_id, item.library_slug)
-                    else:
-                        # Fallback to slug matching for backwards compatibility
-                        for account in accounts:
-                            if account.slug == item.library_slug:
-                                library_label = label_map.get(account.account_id, item.library_slug)
-                                break
-                    
-                    # Truncate long library labels
-                    if len(library_label) > 18:
-                        library_label = library_label[:15] + "..."
-                    
-                    # Truncate long titles
-                    title = item.title
-                    if len(title) > 58:
-                        title = title[:55] + "..."
-                    
-                    # Truncate long author names
-                    author = item.author or ""
-                    if len(author) > 28:
-                        author = author[:25] + "..."
-                    
-                    return_date_str = str(item.return_date) if item.return_date else "N/A"
-                    
-                    table_data.append([library_label, title, author, return_date_str])
-                
-                headers = ["Library", "Title", "Author", "Return Date"]
-                print(tabulate(table_data, headers=headers, tablefmt="github"))
-            
-            print()
+            warn_errors(all_history.errors)
+            write_section(
+                "Checkout History",
+                ["Library", "Title", "Author", "Return Date"],
+                [
+                    (
+                        display_label(item),
+                        truncate(item.title, MAX_TITLE_LEN),
+                        truncate(item.author or "", MAX_AUTHOR_LEN),
+                        format_date(item.return_date),
+                    )
+                    for item in all_history.sorted_by_return_date(limit=args.limit)
+                ],
+                total_line=f"**Total: {all_history.total_count} items**",
+                empty_message="No checkout history found.",
+                render_table=render_table,
+            )
     
     return 0
 
@@ -0,0 +1,168 @@
+"""Helpers shared by the command-line interfaces."""
+
+from __future__ import annotations
+
+import asyncio
+import unicodedata
+from typing import Awaitable, Callable, Sequence
+
+ELLIPSIS = "..."
+
+# Table formats accepted by the CLIs' --format option
+TABLE_FORMATS = ("github", "tsv")
+
+
+def run_async(main: Callable[[], Awaitable[int]]) -> int:
+    """
+    Run a CLI's async main function, using uvloop if it is installed.
+    
+    Args:
+        main: The async main function to run.
+        
+    Returns:
+        The exit code returned by main.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main())
+    
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        return runner.run(main())
+
+
+def truncate(text: str, max_len: int) -> str:
+    """Truncate text to max_len, adding '...' suffix if needed."""
+    if len(text) > max_len:
+        return text[:max_len - len(ELLIPSIS)] + ELLIPSIS
+    return text
+
+
+def load_json_file(path: str):
+    """
+    Load a JSON file, using orjson if it is installed.
+    
+    Args:
+        path: Path to the JSON file.
+        
+    Returns:
+        The parsed JSON data.
+        
+    Raises:
+        OSError: If the file can't be read.
+        ValueError: If the file is not valid JSON.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    
+    try:
+        import orjson
+    except ImportError:
+        import json
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def render_github_table(
+    headers: Sequence[str],
+    rows: Sequence[Sequence[str]],
+    align_numbers: bool = True,
+) -> str:
+    """
+    Render rows of strings as a GitHub-flavored Markdown table.
+    
+    The layout matches tabulate's "github" format, but column widths are
+    measured in a single pass over the rows. As in tabulate, columns of
+    integers are right-aligned and all other columns are left-aligned.
+    
+    Widths are measured in terminal columns rather than characters, so
+    Hebrew niqqud and other combining marks don't throw off the padding.
+    wcwidth is used for this when it is installed, as tabulate does.
+    
+    Args:
+        headers: Column headers.
+        rows: Table rows, each with one string per column.
+        align_numbers: Whether to right-align integer columns. If False, all
+                       columns are left-aligned, like tabulate's disable_numparse.
+        
+    Returns:
+        The table as a string, without a trailing newline.
+    """
+    try:
+        from wcwidth import wcswidth
+    except ImportError:
+        measure = _display_width
+    else:
+        # wcswidth returns -1 for text with control characters
+        def measure(text: str) -> int:
+            width = wcswidth(text)
+            return width if width >= 0 else _display_width(text)
+    
+    header_widths = [measure(header) for header in headers]
+    row_widths = [[measure(cell) for cell in row] for row in rows]
+    
+    # Headers get two characters of extra room, as in tabulate
+    widths = [width + 2 for width in header_widths]
+    for cell_widths in row_widths:
+        for i, width in enumerate(cell_widths):
+            if width > widths[i]:
+                widths[i] = width
+    
+    # Empty cells don't count, so a column with missing values stays numeric
+    right_aligned = [
+        any(column) and all(_is_int(cell) for cell in column if cell)
+        for column in zip(*rows)
+    ] if align_numbers and rows else [False] * len(headers)
+    
+    def render_row(cells: Sequence[str], cell_widths: list[int]) -> str:
+        padded = [
+            _pad(cell, width - cell_width, right)
+            for cell, cell_width, width, right in zip(cells, cell_widths, widths, right_aligned)
+        ]
+        return "| " + " | ".join(padded) + " |"
+    
+    lines = [
+        render_row(headers, header_widths),
+        "|" + "|".join("-" * (width + 2) for width in widths) + "|",
+    ]
+    lines.extend(render_row(row, cell_widths) for row, cell_widths in zip(rows, row_widths))
+    return "\n".join(lines)
+
+
+def _display_width(text: str) -> int:
+    """Count the terminal columns text takes up, without wcwidth."""
+    return sum(
+        0 if unicodedata.combining(char) else 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+        for char in text
+    )
+
+
+def _pad(text: str, padding: int, right: bool) -> str:
+    """Pad text with spaces on the left if right-aligned, else on the right."""
+    return " " * padding + text if right else text + " " * padding
+
+
+def _is_int(cell: str) -> bool:
+    """Check if a table cell holds an integer, which tabulate right-aligns."""
+    return cell.removeprefix("-").isdigit()
+
+
+def render_tsv_table(headers: Sequence[str], rows: Sequence[Sequence[str]]) -> str:
+    """
+    Render rows of strings as tab-separated values with a header line.
+    
+    Cells are written as is, with no padding, so the output is cheap to
+    produce and easy to parse. Tabs and newlines inside cells are replaced
+    by spaces to keep one row per line.
+    
+    Args:
+        headers: Column headers.
+        rows: Table rows, each with one string per column.
+        
+    Returns:
+        The table as a string, without a trailing newline.
+    """
+    clean = str.maketrans("\t\n\r", "   ")
+    lines = ["\t".join(headers)]
+    lines.extend("\t".join(cell.translate(clean) for cell in row) for row in rows)
+    return "\n".join(lines)
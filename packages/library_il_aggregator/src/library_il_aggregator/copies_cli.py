@@ -4,31 +4,47 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
 import os
 import sys
-from typing import Optional
+from typing import NamedTuple, Optional
 
-from tabulate import tabulate
-
-from library_il_aggregator import SearchAggregator
+from library_il_aggregator.cli_utils import (
+    TABLE_FORMATS,
+    load_json_file,
+    render_github_table,
+    render_tsv_table,
+    run_async,
+    truncate,
+)
+from library_il_aggregator.limits import DEFAULT_MAX_CONCURRENCY_PER_SLUG
 
 # Display truncation constants
 MAX_TITLE_LEN = 40
 MAX_AUTHOR_LEN = 25
 MAX_ID_LEN = 15
 
+# Copy status text meaning the copy can be borrowed ("available")
+AVAILABLE_STATUS = "זמין"
+
 
-def truncate(text: str, max_len: int) -> str:
-    """Truncate text to max_len, adding '...' suffix if needed."""
-    if len(text) > max_len:
-        return text[:max_len - 3] + "..."
-    return text
+class CopyRow(NamedTuple):
+    """One row of the copies table: a single copy of a book at a library."""
+    slug: str
+    id: str
+    title: str
+    author: str
+    barcode: str
+    status: str
+    location: str
+    classification: str
+    shelf_sign: str
+    return_date: str
+    hold_count: Optional[int]
 
 
 def main() -> int:
     """Main entry point for the copies CLI."""
-    return asyncio.run(async_main())
+    return run_async(async_main)
 
 
 def parse_slug_id(value: str) -> tuple[str, str]:
@@ -45,11 +61,11 @@ def parse_slug_id(value: str) -> tuple[str, str]:
     Raises:
         ValueError: If the format is invalid
     """
-    for sep in [":", "/"]:
-        if sep in value:
-            parts = value.split(sep, 1)
-            if len(parts) == 2 and parts[0] and parts[1]:
-                return (parts[0], parts[1])
+    slug, _, title_id = value.partition(":")
+    if not (slug and title_id):
+        slug, _, title_id = value.partition("/")
+    if slug and title_id:
+        return (slug, title_id)
     
     raise ValueError(
         f"Invalid slug-id format: '{value}'. Expected 'slug:id' or 'slug/id'"
@@ -77,6 +93,12 @@ Examples:
   # Use a JSON config file for credentials
   library-il-copies shemesh:ABC123 --config accounts.json
   
+  # Look up many books at one library, at most 2 requests at a time
+  library-il-copies shemesh:ABC123 shemesh:DEF456 shemesh:GHI789 --jobs 2
+  
+  # Tab-separated output for scripts
+  library-il-copies shemesh:ABC123 --format tsv
+  
   # Config file format (accounts.json):
   # [
   #   {"slug": "shemesh", "username": "tz", "password": "pass"},
@@ -122,8 +144,34 @@ Authentication:
         help="Password. Uses LIBRARY_PASSWORD env var if not provided.",
     )
     
+    # Output options
+    output_group = parser.add_argument_group("Output Options")
+    output_group.add_argument(
+        "--format",
+        "-f",
+        choices=TABLE_FORMATS,
+        default="github",
+        help="Table format: github (Markdown, default) or tsv (tab-separated, for scripts)",
+    )
+    
+    # Network options
+    network_group = parser.add_argument_group("Network Options")
+    network_group.add_argument(
+        "--max-concurrency",
+        "--jobs",
+        "-j",
+        dest="max_concurrency",
+        metavar="N",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY_PER_SLUG,
+        help=f"Maximum concurrent requests to each library website (default {DEFAULT_MAX_CONCURRENCY_PER_SLUG})",
+    )
+    
     args = parser.parse_args()
     
+    if args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
+    
     # Parse the slug-id pairs
     slug_id_pairs: list[tuple[str, str]] = []
     for arg in args.books:
@@ -147,17 +195,19 @@ Authentication:
     if args.config:
         # Load from config file
         try:
-            with open(args.config) as f:
-                config_data = json.load(f)
+            config_data = load_json_file(args.config)
             
-            for item in config_data:
-                slug = item["slug"]
-                if slug in unique_slugs:
-                    credentials[slug] = (item["username"], item["password"])
+            # Later entries for the same library override earlier ones
+            wanted = set(unique_slugs)
+            credentials = {
+                item["slug"]: (item["username"], item["password"])
+                for item in config_data
+                if item["slug"] in wanted
+            }
         except FileNotFoundError:
             print(f"Error: Config file not found: {args.config}", file=sys.stderr)
             return 1
-        except (json.JSONDecodeError, KeyError) as e:
+        except (ValueError, KeyError) as e:
             print(f"Error: Invalid config file: {e}", file=sys.stderr)
             return 1
     else:
@@ -170,7 +220,10 @@ Authentication:
             for slug in unique_slugs:
                 credentials[slug] = (username, password)
     
-    async with SearchAggregator(unique_slugs) as aggregator:
+    # Deferred until there is something to fetch (see cli.py)
+    from library_il_aggregator import SearchAggregator
+    
+    async with SearchAggregator(unique_slugs, max_concurrency_per_slug=args.max_concurrency) as aggregator:
         # Login if credentials were provided (in parallel)
         if credentials:
             print(f"Logging in to {len(credentials)} library(s)...")
@@ -183,125 +236,141 @@ Authentication:
         print(f"Fetching copies from {len(unique_slugs)} library(s): {', '.join(unique_slugs)}")
         print()
         
-        # Fetch details for all books (preserving order from input)
-        all_copies_data: list[dict] = []
+        # Rows and errors, in the order the books were given
+        all_copies_data: list[CopyRow] = []
         errors: list[str] = []
         has_authenticated_data = False
         
-        for slug, title_id in slug_id_pairs:
-            try:
-                details = await aggregator.get_combined_details([(slug, title_id)])
+        # Fetch details for all books in parallel; gather keeps input order
+        results = await asyncio.gather(
+            *(aggregator.get_combined_details([pair]) for pair in slug_id_pairs),
+            return_exceptions=True,
+        )
+        
+        for (slug, title_id), details in zip(slug_id_pairs, results):
+            if isinstance(details, Exception):
+                errors.append(f"{slug}:{title_id} - {str(details)}")
+                continue
+            
+            if details.errors:
+                for err_slug, error in details.errors.items():
+                    errors.append(f"{err_slug}:{title_id} - {error}")
+                continue
+            
+            # Get the book details for this specific library
+            lib_details = next(
+                (ld for ld in details.library_details if ld.library_slug == slug),
+                None,
+            )
+            if lib_details is None:
+                errors.append(f"{slug}:{title_id} - No details found")
+                continue
+            
+            # Track if we've added hold count to first unavailable copy
+            first_unavailable_with_holds = True
+            
+            # Add each copy as a row
+            for copy in lib_details.copies:
+                # Format return date
+                return_date_str = ""
+                if copy.return_date:
+                    return_date_str = copy.return_date.strftime("%d/%m/%Y")
                 
-                if details.errors:
-                    for err_slug, error in details.errors.items():
-                        errors.append(f"{err_slug}:{title_id} - {error}")
-                    continue
+                # Check if we have authenticated data
+                if copy.status:
+                    has_authenticated_data = True
                 
-                # Get the book details for this specific library
-                for lib_details in details.library_details:
-                    if lib_details.library_slug == slug:
-                        # Track if we've added hold count to first unavailable copy
-                        first_unavailable_with_holds = True
-                        
-                        # Add each copy as a row
-                        for copy in lib_details.copies:
-                            # Format return date
-                            return_date_str = ""
-                            if copy.return_date:
-                                return_date_str = copy.return_date.strftime("%d/%m/%Y")
-                            
-                            # Check if we have authenticated data
-                            if copy.status:
-                                has_authenticated_data = True
-                            
-                            # For the first not available copy, append hold count
-                            status_str = copy.status or ""
-                            is_available = status_str and "זמין" in status_str
-                            if (first_unavailable_with_holds and 
-                                not is_available and 
-                                status_str and 
-                                lib_details.hold_count is not None):
-                                status_str = f"{status_str} ({lib_details.hold_count})"
-                                first_unavailable_with_holds = False
-                            
-                            all_copies_data.append({
-                                "slug": slug,
-                                "id": title_id,
-                                "title": lib_details.title,
-                                "author": lib_details.author or "",
-                                "barcode": copy.barcode or "",
-                                "status": status_str,
-                                "location": copy.location or "",
-                                "classification": copy.classification or "",
-                                "shelf_sign": copy.shelf_sign or "",
-                                "return_date": return_date_str,
-                                "hold_count": lib_details.hold_count,
-                            })
-                        
-                        # If no copies, still show the book info
-                        if not lib_details.copies:
-                            all_copies_data.append({
-                                "slug": slug,
-                                "id": title_id,
-                                "title": lib_details.title,
-                                "author": lib_details.author or "",
-                                "barcode": "(no copies)",
-                                "status": "",
-                                "location": "",
-                                "classification": "",
-                                "shelf_sign": "",
-                                "return_date": "",
-                                "hold_count": lib_details.hold_count,
-                            })
-                        break
-                else:
-                    # Book details not found for this slug
-                    errors.append(f"{slug}:{title_id} - No details found")
-                    
-            except Exception as e:
-                errors.append(f"{slug}:{title_id} - {str(e)}")
+                # For the first not available copy, append hold count
+                status_str = copy.status or ""
+                is_available = AVAILABLE_STATUS in status_str
+                if (first_unavailable_with_holds and 
+                    not is_available and 
+                    status_str and 
+                    lib_details.hold_count is not None):
+                    status_str = f"{status_str} ({lib_details.hold_count})"
+                    first_unavailable_with_holds = False
+                
+                all_copies_data.append(CopyRow(
+                    slug=slug,
+                    id=title_id,
+                    title=lib_details.title,
+                    author=lib_details.author or "",
+                    barcode=copy.barcode or "",
+                    status=status_str,
+                    location=copy.location or "",
+                    classification=copy.classification or "",
+                    shelf_sign=copy.shelf_sign or "",
+                    return_date=return_date_str,
+                    hold_count=lib_details.hold_count,
+                ))
+            
+            # If no copies, still show the book info
+            if not lib_details.copies:
+                all_copies_data.append(CopyRow(
+                    slug=slug,
+                    id=title_id,
+                    title=lib_details.title,
+                    author=lib_details.author or "",
+                    barcode="(no copies)",
+                    status="",
+                    location="",
+                    classification="",
+                    shelf_sign="",
+                    return_date="",
+                    hold_count=lib_details.hold_count,
+                ))
+        
+        # Collect the report's lines and write them in one call
+        out: list[str] = []
         
         # Show errors if any
         if errors:
-            print("**Errors:**")
+            out.append("**Errors:**")
             for error in errors:
-                print(f"  ✗ {error}")
-            print()
+                out.append(f"  ✗ {error}")
+            out.append("")
         
         if not all_copies_data:
-            print("No copies found.")
+            out.append("No copies found.")
+            sys.stdout.write("\n".join(out) + "\n")
             return 0
         
-        print("## Book Copies")
-        print()
-        print(f"**Total: {len(all_copies_data)} copies**")
-        print()
+        out.append("## Book Copies")
+        out.append("")
+        out.append(f"**Total: {len(all_copies_data)} copies**")
+        out.append("")
         
         # Prepare table data
-        table_data = []
-        for row in all_copies_data:
-            row_data = [
-                row["slug"],
-                truncate(row["id"], MAX_ID_LEN),
-                truncate(row["title"], MAX_TITLE_LEN),
-                truncate(row["author"], MAX_AUTHOR_LEN),
-                row["barcode"],
-                row["status"],
-                row["location"],
-                row["classification"],
-                row["shelf_sign"],
-                row["return_date"],
-            ]
-            table_data.append(row_data)
+        table_data = [
+            (
+                row.slug,
+                truncate(row.id, MAX_ID_LEN),
+                truncate(row.title, MAX_TITLE_LEN),
+                truncate(row.author, MAX_AUTHOR_LEN),
+                row.barcode,
+                row.status,
+                row.location,
+                row.classification,
+                row.shelf_sign,
+                row.return_date,
+            )
+            for row in all_copies_data
+        ]
         
         headers = ["Library", "ID", "Title", "Author", "Barcode", "Status", "Location", "Classification", "Shelf", "Return Date"]
-        print(tabulate(table_data, headers=headers, tablefmt="github"))
+        if args.format == "tsv":
+            out.append(render_tsv_table(headers, table_data))
+        else:
+            # Cells are plain text, so digit-only columns stay left-aligned
+            out.append(render_github_table(headers, table_data, align_numbers=False))
         
         # Show note if no authenticated data was found
         if not has_authenticated_data:
-            print()
-            print("*Note: Status and Return Date columns require authentication.*")
-            print("*Use --username and --password, or set TEUDAT_ZEHUT and LIBRARY_PASSWORD.*")
+            out.append("")
+            out.append("*Note: Status and Return Date columns require authentication.*")
+            out.append("*Use --username and --password, or set TEUDAT_ZEHUT and LIBRARY_PASSWORD.*")
+        
+        sys.stdout.write("\n".join(out) + "\n")
     
     return 0
 
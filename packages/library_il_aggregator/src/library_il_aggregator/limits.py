@@ -0,0 +1,8 @@
+"""Default request limits shared by the aggregators and the CLIs.
+
+This module has no third-party imports, so the CLIs can show these defaults
+in --help without loading the HTTP stack.
+"""
+
+# Default cap on in-flight requests to a single library website
+DEFAULT_MAX_CONCURRENCY_PER_SLUG = 4
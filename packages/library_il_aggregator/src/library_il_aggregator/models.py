@@ -1,5 +1,6 @@
 """Data models for aggregated library data."""
 
+import heapq
 from dataclasses import dataclass, field
 from datetime import date
 from typing import Optional
@@ -7,6 +8,16 @@ from typing import Optional
 from library_il_client import BookCopy, BookDetails, CheckedOutBook, HistoryItem, SearchResult
 
 
+def _due_date_key(book: CheckedOutBook) -> tuple[date, str]:
+    """Sort key for books: due date (undated last), then title."""
+    return (book.due_date or date.max, book.title)
+
+
+def _return_date_key(item: HistoryItem) -> tuple[date, str]:
+    """Sort key for history items: return date (undated earliest), then title."""
+    return (item.return_date or date.min, item.title)
+
+
 @dataclass
 class AggregatedBooks:
     """Aggregated checked out books from multiple libraries."""
@@ -31,12 +42,18 @@ class AggregatedBooks:
             result[slug].append(book)
         return result
     
-    def sorted_by_due_date(self) -> list[CheckedOutBook]:
-        """Get all books sorted by due date (earliest first)."""
-        return sorted(
-            self.books,
-            key=lambda b: (b.due_date or date.max, b.title),
-        )
+    def sorted_by_due_date(self, limit: int = 0) -> list[CheckedOutBook]:
+        """
+        Get books sorted by due date (earliest first).
+        
+        Args:
+            limit: If positive, return only the first ``limit`` books. Only
+                   those books are ordered, which is faster than sorting
+                   everything when the limit is small.
+        """
+        if limit > 0:
+            return heapq.nsmallest(limit, self.books, key=_due_date_key)
+        return sorted(self.books, key=_due_date_key)
 
 
 @dataclass
@@ -63,13 +80,28 @@ class AggregatedHistory:
             result[slug].append(item)
         return result
     
-    def sorted_by_return_date(self, descending: bool = True) -> list[HistoryItem]:
-        """Get all history items sorted by return date."""
-        return sorted(
-            self.items,
-            key=lambda i: (i.return_date or date.min, i.title),
-            reverse=descending,
-        )
+    def sorted_by_return_date(self, descending: bool = True, limit: int = 0) -> list[HistoryItem]:
+        """
+        Get history items sorted by return date.
+        
+        Args:
+            descending: Whether to put the most recent returns first.
+            limit: If positive, return only the first ``limit`` items. Only
+                   those items are ordered, which is faster than sorting
+                   everything when the limit is small.
+        """
+        if limit > 0:
+            select = heapq.nlargest if descending else heapq.nsmallest
+            return select(limit, self.items, key=_return_date_key)
+        return sorted(self.items, key=_return_date_key, reverse=descending)
+
+
+@dataclass
+class AggregatedBooksAndHistory:
+    """Checked out books and checkout history fetched in a single pass."""
+    
+    books: AggregatedBooks = field(default_factory=AggregatedBooks)
+    history: AggregatedHistory = field(default_factory=AggregatedHistory)
 
 
 @dataclass
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Optional
+from typing import Awaitable, Callable, Optional, TypeVar
 
+import httpx
 from library_il_client import BookDetails, LibraryClient, LoginError, SearchResult, SearchResults
 
+from library_il_aggregator.limits import DEFAULT_MAX_CONCURRENCY_PER_SLUG
 from library_il_aggregator.models import (
     CombinedBookDetails,
     CombinedSearchResult,
@@ -14,6 +16,8 @@ from library_il_aggregator.models import (
     LibrarySearchInfo,
 )
 
+_T = TypeVar("_T")
+
 
 class SearchAggregator:
     """
@@ -26,6 +30,14 @@ class SearchAggregator:
     However, login is required to get authenticated copy information
     (status, return date, hold count).
     
+    All clients share one connection pool, which stays open for the
+    aggregator's lifetime, so repeated searches and detail lookups reuse
+    open connections instead of paying for new TLS handshakes.
+    
+    Requests to the same library are capped at ``max_concurrency_per_slug``
+    at a time, so looking up many books at one library doesn't trigger its
+    rate limiting. Requests to different libraries still run in parallel.
+    
     Example:
         >>> async with SearchAggregator(["shemesh", "betshemesh"]) as aggregator:
         ...     results = await aggregator.search(title="כראמל")
@@ -42,16 +54,28 @@ class SearchAggregator:
         ...     # Now details will include status, return_date, hold_count
     """
     
-    def __init__(self, library_slugs: list[str]):
+    def __init__(
+        self,
+        library_slugs: list[str],
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_concurrency_per_slug: int = DEFAULT_MAX_CONCURRENCY_PER_SLUG,
+    ):
         """
         Initialize the search aggregator.
         
         Args:
             library_slugs: List of library identifiers to search
+            transport: Optional HTTP transport (connection pool) shared by all clients.
+                       If not provided, the aggregator creates one and closes it in close().
+            max_concurrency_per_slug: Maximum number of concurrent requests to a single library.
         """
         self.library_slugs = library_slugs
+        self.max_concurrency_per_slug = max_concurrency_per_slug
         self._clients: dict[str, LibraryClient] = {}
         self._logged_in_slugs: set[str] = set()
+        self._slug_semaphores: dict[str, asyncio.Semaphore] = {}  # slug -> semaphore
+        self._transport = transport  # Created lazily if not provided
+        self._owns_transport = transport is None
     
     async def __aenter__(self) -> "SearchAggregator":
         """Async context manager entry."""
@@ -68,13 +92,37 @@ class SearchAggregator:
             await asyncio.gather(*close_tasks, return_exceptions=True)
         self._clients.clear()
         self._logged_in_slugs.clear()
+        
+        # Close the shared connection pool only if we created it
+        if self._owns_transport and self._transport is not None:
+            await self._transport.aclose()
+            self._transport = None
+    
+    def _get_transport(self) -> httpx.AsyncBaseTransport:
+        """Get the connection pool shared by all clients, creating it if needed."""
+        if self._transport is None:
+            self._transport = httpx.AsyncHTTPTransport()
+        return self._transport
     
     def _get_or_create_client(self, slug: str) -> LibraryClient:
         """Get or create a client for the specified library."""
         if slug not in self._clients:
-            self._clients[slug] = LibraryClient(slug)
+            self._clients[slug] = LibraryClient(slug, transport=self._get_transport())
         return self._clients[slug]
     
+    def _slug_semaphore(self, slug: str) -> asyncio.Semaphore:
+        """Get the semaphore limiting concurrent requests to a library."""
+        semaphore = self._slug_semaphores.get(slug)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_slug)
+            self._slug_semaphores[slug] = semaphore
+        return semaphore
+    
+    async def _limited(self, slug: str, fetch: Callable[[], Awaitable[_T]]) -> _T:
+        """Call fetch while holding the library's concurrency slot."""
+        async with self._slug_semaphore(slug):
+            return await fetch()
+    
     async def login(
         self,
         slug: str,
@@ -100,7 +148,7 @@ class SearchAggregator:
         """
         client = self._get_or_create_client(slug)
         try:
-            await client.login(username, password)
+            await self._limited(slug, lambda: client.login(username, password))
             self._logged_in_slugs.add(slug)
             return True
         except LoginError:
@@ -171,12 +219,12 @@ class SearchAggregator:
         async def search_library(slug: str) -> tuple[str, Optional[SearchResults], Optional[str]]:
             try:
                 client = self._get_or_create_client(slug)
-                results = await client.search(
+                results = await self._limited(slug, lambda: client.search(
                     title=title,
                     author=author,
                     series=series,
                     max_results=max_per_library,
-                )
+                ))
                 return slug, results, None
             except Exception as e:
                 return slug, None, str(e)
@@ -333,7 +381,7 @@ class SearchAggregator:
         async def fetch_details(slug: str, title_id: str) -> tuple[str, Optional[BookDetails], Optional[str]]:
             try:
                 client = self._get_or_create_client(slug)
-                details = await client.get_book_details(title_id)
+                details = await self._limited(slug, lambda: client.get_book_details(title_id))
                 return slug, details, None
             except Exception as e:
                 return slug, None, str(e)
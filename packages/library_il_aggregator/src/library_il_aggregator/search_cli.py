@@ -3,17 +3,49 @@
 from __future__ import annotations
 
 import argparse
-import asyncio
 import sys
+from typing import TYPE_CHECKING
 
-from tabulate import tabulate
+from library_il_aggregator.cli_utils import (
+    TABLE_FORMATS,
+    render_github_table,
+    render_tsv_table,
+    run_async,
+    truncate,
+)
 
-from library_il_aggregator import SearchAggregator
+if TYPE_CHECKING:
+    from library_il_aggregator import CombinedSearchResult
+
+# Display truncation constants
+MAX_TITLE_LEN = 50
+MAX_AUTHOR_LEN = 30
+MAX_LIBRARIES_LEN = 25
+
+
+def format_series(item: CombinedSearchResult) -> str:
+    """Format the series name and number of a search result, e.g. "Series #3"."""
+    if item.series:
+        if item.series_number:
+            return f"{item.series} #{item.series_number}"
+        return item.series
+    if item.series_number:
+        return f"#{item.series_number}"
+    return ""
+
+
+def format_slug_ids(item: CombinedSearchResult) -> str:
+    """Format the slug:id pairs of a search result, for use with library-il-copies."""
+    return " ".join(
+        f"{r.library_slug}:{r.title_id}"
+        for r in item.library_results
+        if r.library_slug and r.title_id
+    )
 
 
 def main() -> int:
     """Main entry point for the search CLI."""
-    return asyncio.run(async_main())
+    return run_async(async_main)
 
 
 async def async_main() -> int:
@@ -40,6 +72,9 @@ Examples:
   
   # Show slug:id pairs for use with library-il-copies command
   library-il-search --title "כראמל" --show-ids
+  
+  # Tab-separated output for scripts
+  library-il-search --title "כראמל" --show-ids --format tsv
 """,
     )
     
@@ -92,6 +127,13 @@ Examples:
         action="store_true",
         help="Show slug:id pairs in output (for use with library-il-copies command)",
     )
+    result_group.add_argument(
+        "--format",
+        "-f",
+        choices=TABLE_FORMATS,
+        default="github",
+        help="Table format: github (Markdown, default) or tsv (tab-separated, for scripts)",
+    )
     
     args = parser.parse_args()
     
@@ -100,6 +142,9 @@ Examples:
         print("Error: At least one search parameter is required (--title, --author, or --series)", file=sys.stderr)
         return 1
     
+    # Deferred until a search will actually run (see cli.py)
+    from library_il_aggregator import SearchAggregator
+    
     async with SearchAggregator(args.libraries) as aggregator:
         print(f"Searching {len(args.libraries)} libraries: {', '.join(args.libraries)}")
         print()
@@ -111,36 +156,37 @@ Examples:
             max_per_library=args.max_per_library,
         )
         
-        # Show library info
-        print("## Library Results Summary")
-        print()
+        # Collect the report's lines and write them in one call
+        out = ["## Library Results Summary", ""]
         
+        # Show library info
         for info in results.library_info:
             status = "✓" if info.fetched_count > 0 else "○"
-            print(f"  {status} {info.library_slug}: {info.fetched_count} of {info.total_count} results")
+            out.append(f"  {status} {info.library_slug}: {info.fetched_count} of {info.total_count} results")
         
         # Show errors
         if results.errors:
-            print()
+            out.append("")
             for slug, error in results.errors.items():
-                print(f"  ✗ {slug}: {error}")
+                out.append(f"  ✗ {slug}: {error}")
         
         # Show warnings
         warnings = results.get_warnings()
         if warnings:
-            print()
-            print("**Warnings:**")
+            out.append("")
+            out.append("**Warnings:**")
             for warning in warnings:
-                print(f"  ⚠ {warning}")
+                out.append(f"  ⚠ {warning}")
         
-        print()
-        print("## Combined Search Results")
-        print()
-        print(f"**Total unique results: {results.total_unique_count}**")
-        print()
+        out.append("")
+        out.append("## Combined Search Results")
+        out.append("")
+        out.append(f"**Total unique results: {results.total_unique_count}**")
+        out.append("")
         
         if not results.items:
-            print("No results found.")
+            out.append("No results found.")
+            sys.stdout.write("\n".join(out) + "\n")
             return 0
         
         # Prepare table data
@@ -148,61 +194,38 @@ Examples:
         if args.limit > 0:
             items_to_show = items_to_show[:args.limit]
         
-        table_data = []
-        for item in items_to_show:
-            # Title (truncate if too long)
-            title = item.title
-            title_display = title
-            if len(title_display) > 50:
-                title_display = title_display[:47] + "..."
-            
-            # Author (truncate if too long)
-            author = item.author or ""
-            if len(author) > 30:
-                author = author[:27] + "..."
-            
-            # Libraries
-            libs = ", ".join(item.library_slugs)
-            if len(libs) > 25:
-                libs = libs[:22] + "..."
-            
-            # Series info
-            series_info = ""
-            if item.series:
-                series_info = item.series
-                if item.series_number:
-                    series_info += f" #{item.series_number}"
-            elif item.series_number:
-                series_info = f"#{item.series_number}"
-            
-            row = [
-                title_display,
-                author,
-                series_info,
-                libs,
+        # Title, author and libraries are truncated if too long
+        table_data = [
+            [
+                truncate(item.title, MAX_TITLE_LEN),
+                truncate(item.author or "", MAX_AUTHOR_LEN),
+                format_series(item),
+                truncate(", ".join(item.library_slugs), MAX_LIBRARIES_LEN),
             ]
-            
-            # Add slug:id pairs column if --show-ids was specified
-            if args.show_ids:
-                slug_ids = []
-                for r in item.library_results:
-                    if r.library_slug and r.title_id:
-                        slug_ids.append(f"{r.library_slug}:{r.title_id}")
-                ids_str = " ".join(slug_ids)
-                row.append(ids_str)
-            
-            table_data.append(row)
+            for item in items_to_show
+        ]
+        
+        # Add slug:id pairs column if --show-ids was specified
+        if args.show_ids:
+            for row, item in zip(table_data, items_to_show):
+                row.append(format_slug_ids(item))
         
         headers = ["Title", "Author", "Series", "Libraries"]
         if args.show_ids:
             headers.append("Slug:ID")
         
-        print(tabulate(table_data, headers=headers, tablefmt="github"))
+        if args.format == "tsv":
+            out.append(render_tsv_table(headers, table_data))
+        else:
+            # Cells are plain text, so digit-only columns stay left-aligned
+            out.append(render_github_table(headers, table_data, align_numbers=False))
         
         # Show if results were truncated
         if args.limit > 0 and results.total_unique_count > args.limit:
-            print()
-            print(f"*Showing {args.limit} of {results.total_unique_count} results*")
+            out.append("")
+            out.append(f"*Showing {args.limit} of {results.total_unique_count} results*")
+        
+        sys.stdout.write("\n".join(out) + "\n")
     
     return 0
 
@@ -0,0 +1,626 @@
+"""Offline tests for LibraryAggregator.
+
+These tests serve a fake library.org.il website through httpx.MockTransport.
+These tests do NOT require network access or credentials.
+"""
+
+import asyncio
+import secrets
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+import pytest
+
+from library_il_client import LibraryClient
+from library_il_aggregator import LibraryAccount, LibraryAggregator, SearchAggregator
+from library_il_aggregator import aggregator as aggregator_module
+
+
+# Configure pytest-asyncio
+pytest_plugins = ('pytest_asyncio',)
+
+
+PASSWORD = "secret"
+
+LOGIN_PAGE = """
+<html><body>
+<form id="login-form" action="/mng?task=user.login" method="post">
+  <input type="text" name="username">
+  <input type="password" name="password">
+  <input type="hidden" name="0123456789abcdef0123456789abcdef" value="1">
+</form>
+</body></html>
+"""
+
+LOGGED_IN_PAGE = '<html><body><a href="/user-loans">ההשאלות שלי</a></body></html>'
+
+LOGIN_FAILED_PAGE = """
+<html><body>
+<div class="alert-error">שם המשתמש או הסיסמה שגויים</div>
+<form id="login-form"></form>
+</body></html>
+"""
+
+LOANS_PAGE = """
+<html><body><table>
+<tr><th></th><th>מס</th><th>מדיה</th><th>מספר עותק</th><th>כותר</th>
+<th>תאריך השאלה</th><th>תאריך החזרה</th><th>ימים נותרים</th></tr>
+<tr><td><input type="checkbox" name="cid[]" value="1001"></td><td>1</td><td>ספרים</td>
+<td>1001</td><td>ספר מספריית {slug}</td><td>01/10/2026</td><td>29/10/2026</td><td>14</td></tr>
+</table></body></html>
+"""
+
+HISTORY_PAGE = """
+<html><body><table>
+<tr><th>מדיה</th><th>מספר עותק</th><th>מחבר</th><th>כותר</th>
+<th>תאריך השאלה</th><th>תאריך החזרה</th></tr>
+<tr><td>ספרים</td><td>2002</td><td>מחבר</td><td>ספר שהוחזר ל{slug}</td>
+<td>01/09/2026</td><td>15/09/2026</td></tr>
+</table></body></html>
+"""
+
+SEARCH_RESULTS_PAGE = """
+<html><body>
+<div>סה''כ תוצאות: {total}</div>
+{items}
+</body></html>
+"""
+
+SEARCH_RESULT_ITEM = '<div class="title-details"><a href="/index.php?view=details&titleId=T{index}">ספר {index}</a></div>'
+
+# Results per search page, as the website serves them
+SEARCH_PAGE_SIZE = 20
+
+
+class FakeLibrarySite:
+    """A fake set of library.org.il websites, served through httpx.MockTransport."""
+    
+    def __init__(self):
+        self.delay = 0.0  # seconds to wait before answering each request
+        self.path_delays: dict[str, float] = {}  # path -> extra delay
+        self.slug_delays: dict[str, float] = {}  # slug -> extra delay
+        self.requests: list[tuple[str, str, str]] = []  # (slug, method, path)
+        self.sessions: set[str] = set()
+        self.search_total = 50  # results found by every search
+        # path -> queued failures (status codes or exceptions) for the next requests
+        self.failures: defaultdict[str, list] = defaultdict(list)
+        self.active: defaultdict[str, int] = defaultdict(int)  # slug -> requests in flight
+        self.peak: defaultdict[str, int] = defaultdict(int)  # slug -> most requests in flight
+        self.transport = httpx.MockTransport(self.handle)
+    
+    def count(self, method: str, path: str, slug: Optional[str] = None) -> int:
+        """Count the requests made with a method and path, optionally to one library."""
+        return sum(
+            1 for s, m, p in self.requests
+            if m == method and p == path and (slug is None or s == slug)
+        )
+    
+    def expire_sessions(self) -> None:
+        """Expire all sessions, as the website does after a while."""
+        self.sessions.clear()
+    
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Record a request and answer it, unless a failure is queued for its path."""
+        slug = request.url.host.split(".")[0]
+        path = request.url.path
+        self.requests.append((slug, request.method, path))
+        self.active[slug] += 1
+        self.peak[slug] = max(self.peak[slug], self.active[slug])
+        try:
+            delay = self.delay + self.path_delays.get(path, 0.0) + self.slug_delays.get(slug, 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            if self.failures[path]:
+                failure = self.failures[path].pop(0)
+                if isinstance(failure, Exception):
+                    raise failure
+                return httpx.Response(failure)
+            return self.respond(request, slug, path)
+        finally:
+            self.active[slug] -= 1
+    
+    def search_page(self, start: int) -> str:
+        """Render the page of search results starting at a result offset."""
+        end = min(start + SEARCH_PAGE_SIZE, self.search_total)
+        items = "\n".join(SEARCH_RESULT_ITEM.format(index=index) for index in range(start, end))
+        return SEARCH_RESULTS_PAGE.format(total=self.search_total, items=items)
+    
+    def respond(self, request: httpx.Request, slug: str, path: str) -> httpx.Response:
+        """Answer a request the way the website does."""
+        if path == "/mng" and request.method == "POST":
+            if f"password={PASSWORD}" not in request.content.decode():
+                return httpx.Response(200, text=LOGIN_FAILED_PAGE)
+            session = secrets.token_hex(8)
+            self.sessions.add(session)
+            return httpx.Response(
+                200,
+                text=LOGGED_IN_PAGE,
+                headers={"Set-Cookie": f"session={session}; Path=/"},
+            )
+        if path == "/mng":
+            return httpx.Response(200, text=LOGIN_PAGE)
+        if path in ("/user-loans", "/loans-history"):
+            if request.headers.get("Cookie", "").removeprefix("session=") not in self.sessions:
+                return httpx.Response(302, headers={"Location": "/mng"})
+            page = LOANS_PAGE if path == "/user-loans" else HISTORY_PAGE
+            return httpx.Response(200, text=page.format(slug=slug))
+        if path == "/agron-catalog/simple-search-submenu":
+            return httpx.Response(200, text="<html><body><form></form></body></html>")
+        if path == "/index.php" and request.method == "POST":
+            return httpx.Response(200, text=self.search_page(0))
+        if path == "/index.php/agron-catalog/search-results-menu":
+            return httpx.Response(200, text=self.search_page(int(request.url.params["start"])))
+        if path == "/index.php":
+            # Book details page; these tests only count the requests
+            return httpx.Response(200, text="<html><body></body></html>")
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def site():
+    """Create a fake library website."""
+    return FakeLibrarySite()
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    """Retry without sleeping between attempts."""
+    with_retry = aggregator_module._with_retry
+    monkeypatch.setattr(aggregator_module, "_with_retry", lambda fetch: with_retry(fetch, base_delay=0))
+
+
+class TestFetching:
+    """Tests for fetching from several accounts at once."""
+    
+    @pytest.mark.asyncio
+    async def test_books_and_history_fetched_together(self, site):
+        """Test that both views are fetched for every logged-in account with one request each."""
+        accounts = [
+            LibraryAccount("shemesh", "user", PASSWORD),
+            LibraryAccount("betshemesh", "user", PASSWORD),
+        ]
+        
+        async with LibraryAggregator(accounts, transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            combined = await aggregator.get_all_books_and_history()
+        
+        assert sorted(combined.books.libraries) == sorted(a.account_id for a in accounts)
+        assert sorted(book.account_id for book in combined.books.books) == sorted(a.account_id for a in accounts)
+        assert sorted(item.account_id for item in combined.history.items) == sorted(a.account_id for a in accounts)
+        assert site.count("GET", "/user-loans") == 2
+        assert site.count("GET", "/loans-history") == 2
+    
+    @pytest.mark.asyncio
+    async def test_errors_are_reported_per_view(self, site):
+        """Test that a failed books fetch doesn't affect the account's history."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        site.failures["/user-loans"] = [404]
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            combined = await aggregator.get_all_books_and_history()
+        
+        assert combined.books.books == []
+        assert account.account_id in combined.books.errors
+        assert combined.history.errors == {}
+        assert len(combined.history.items) == 1
+    
+    @pytest.mark.asyncio
+    async def test_results_follow_account_order(self, site):
+        """Test that results are combined in account order, not in the order fetches finish."""
+        accounts = [
+            LibraryAccount("shemesh", "user", PASSWORD),
+            LibraryAccount("betshemesh", "user", PASSWORD),
+        ]
+        
+        async with LibraryAggregator(accounts, transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            site.slug_delays["shemesh"] = 0.05
+            combined = await aggregator.get_all_books_and_history()
+        
+        expected = [a.account_id for a in accounts]
+        assert combined.books.libraries == expected
+        assert [book.account_id for book in combined.books.books] == expected
+        assert [item.account_id for item in combined.history.items] == expected
+    
+    @pytest.mark.asyncio
+    async def test_iter_checked_out_books(self, site):
+        """Test that each account's books are yielded once, with errors reported per account."""
+        accounts = [
+            LibraryAccount("shemesh", "user", PASSWORD),
+            LibraryAccount("betshemesh", "user", PASSWORD),
+        ]
+        # Not retried, so exactly one of the accounts fails
+        site.failures["/user-loans"] = [404]
+        
+        async with LibraryAggregator(accounts, transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            batches = [batch async for batch in aggregator.iter_checked_out_books()]
+        
+        assert sorted(account_id for account_id, _, _ in batches) == sorted(a.account_id for a in accounts)
+        failed = [(books, error) for _, books, error in batches if error]
+        assert len(failed) == 1
+        assert failed[0][0] == []
+        assert sum(len(books) for _, books, _ in batches) == 1
+    
+    @pytest.mark.asyncio
+    async def test_login_and_fetch_all(self, site):
+        """Test that accounts failing to log in are left out of the combined result."""
+        good = LibraryAccount("shemesh", "user", PASSWORD)
+        bad = LibraryAccount("betshemesh", "user", "wrong")
+        
+        async with LibraryAggregator([good, bad], transport=site.transport) as aggregator:
+            combined = await aggregator.login_and_fetch_all()
+        
+        assert combined.books.libraries == [good.account_id]
+        assert combined.history.libraries == [good.account_id]
+        assert [book.account_id for book in combined.books.books] == [good.account_id]
+        assert [item.account_id for item in combined.history.items] == [good.account_id]
+    
+    @pytest.mark.asyncio
+    async def test_login_and_fetch_all_books_only(self, site):
+        """Test that views that aren't requested are left empty and not fetched."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            combined = await aggregator.login_and_fetch_all(books=True, history=False)
+        
+        assert len(combined.books.books) == 1
+        assert combined.history.items == []
+        assert site.count("GET", "/loans-history") == 0
+
+
+class TestConcurrencyLimit:
+    """Tests for the per-library concurrency limit."""
+    
+    @pytest.mark.asyncio
+    async def test_library_aggregator_limits_requests_per_slug(self, site):
+        """Test that requests to one library never exceed max_concurrency_per_slug."""
+        site.delay = 0.01
+        accounts = [LibraryAccount("shemesh", f"user{i}", PASSWORD) for i in range(6)]
+        accounts.append(LibraryAccount("betshemesh", "user", PASSWORD))
+        
+        async with LibraryAggregator(accounts, max_concurrency_per_slug=2, transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            combined = await aggregator.get_all_books_and_history()
+        
+        assert len(combined.books.books) == 7
+        assert len(combined.history.items) == 7
+        assert site.peak["shemesh"] == 2
+        assert site.peak["betshemesh"] <= 2
+    
+    @pytest.mark.asyncio
+    async def test_search_aggregator_limits_requests_per_slug(self, site):
+        """Test that SearchAggregator requests to one library are limited too."""
+        site.delay = 0.01
+        pairs = [("shemesh", str(title_id)) for title_id in range(6)]
+        
+        async with SearchAggregator(["shemesh"], transport=site.transport, max_concurrency_per_slug=2) as aggregator:
+            await aggregator.get_combined_details(pairs)
+        
+        assert site.count("GET", "/index.php") == 6
+        assert site.peak["shemesh"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_search_pages_share_the_library_limit(self, site):
+        """Test that a multi-page search and detail lookups at one library stay within the limit."""
+        site.delay = 0.01
+        pairs = [("shemesh", str(title_id)) for title_id in range(3)]
+        
+        async with SearchAggregator(["shemesh"], transport=site.transport, max_concurrency_per_slug=1) as aggregator:
+            results, _ = await asyncio.gather(
+                aggregator.search(title="ספר", max_per_library=50),
+                aggregator.get_combined_details(pairs),
+            )
+        
+        assert len(results.items) == 50
+        assert site.count("GET", "/index.php/agron-catalog/search-results-menu") == 2
+        assert site.peak["shemesh"] == 1
+
+
+class TestSessionCache:
+    """Tests for saving and reusing sessions in session_cache_dir."""
+    
+    @pytest.mark.asyncio
+    async def test_saved_session_is_reused(self, site, tmp_path):
+        """Test that a second aggregator reuses the saved session without logging in."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport, session_cache_dir=tmp_path) as aggregator:
+            assert await aggregator.login_all() == {account.account_id: True}
+        assert site.count("POST", "/mng") == 1
+        assert len(list(tmp_path.iterdir())) == 1
+        
+        async with LibraryAggregator([account], transport=site.transport, session_cache_dir=tmp_path) as aggregator:
+            assert await aggregator.login_all() == {account.account_id: True}
+            books = await aggregator.get_all_checked_out_books()
+        
+        assert site.count("POST", "/mng") == 1
+        assert [book.title for book in books.books] == ["ספר מספריית shemesh"]
+    
+    @pytest.mark.asyncio
+    async def test_expired_session_logs_in_again(self, site, tmp_path):
+        """Test that an expired saved session is replaced by a fresh login."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport, session_cache_dir=tmp_path) as aggregator:
+            await aggregator.login_all()
+        site.expire_sessions()
+        
+        async with LibraryAggregator([account], transport=site.transport, session_cache_dir=tmp_path) as aggregator:
+            await aggregator.login_all()
+            books = await aggregator.get_all_checked_out_books()
+        
+        assert books.errors == {}
+        assert len(books.books) == 1
+        assert site.count("POST", "/mng") == 2
+    
+    @pytest.mark.asyncio
+    async def test_saved_session_is_private(self, site, tmp_path):
+        """Test that saving over an existing session file makes it readable only by the user."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport, session_cache_dir=tmp_path) as aggregator:
+            await aggregator.login_all()
+        [session_file] = tmp_path.iterdir()
+        session_file.chmod(0o644)
+        site.expire_sessions()
+        
+        async with LibraryAggregator([account], transport=site.transport, session_cache_dir=tmp_path) as aggregator:
+            await aggregator.login_all()
+            await aggregator.get_all_checked_out_books()
+        
+        assert site.count("POST", "/mng") == 2
+        assert session_file.stat().st_mode & 0o777 == 0o600
+    
+    @pytest.mark.asyncio
+    async def test_unwritable_cache_dir(self, site, tmp_path):
+        """Test that failing to save the session doesn't fail the login."""
+        # A regular file where the directory should be makes mkdir fail
+        blocker = tmp_path / "not-a-dir"
+        blocker.write_text("")
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator(
+            [account],
+            transport=site.transport,
+            session_cache_dir=blocker / "sessions",
+        ) as aggregator:
+            assert await aggregator.login_all() == {account.account_id: True}
+            books = await aggregator.get_all_checked_out_books()
+        
+        assert books.errors == {}
+        assert len(books.books) == 1
+
+
+class TestRetry:
+    """Tests for retrying transient network errors."""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("failure", [503, 429, httpx.ConnectError("connection refused")])
+    async def test_transient_error_is_retried(self, site, no_backoff, failure):
+        """Test that 5xx, 429 and connection errors are retried until the fetch succeeds."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        site.failures["/user-loans"] = [failure, failure]
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            books = await aggregator.get_all_checked_out_books()
+        
+        assert books.errors == {}
+        assert len(books.books) == 1
+        assert site.count("GET", "/user-loans") == 3
+    
+    @pytest.mark.asyncio
+    async def test_gives_up_after_all_attempts(self, site, no_backoff):
+        """Test that the error is reported once every attempt has failed."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        site.failures["/user-loans"] = [503] * aggregator_module.RETRY_ATTEMPTS
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            books = await aggregator.get_all_checked_out_books()
+        
+        assert books.books == []
+        assert "503" in books.errors[account.account_id]
+        assert site.count("GET", "/user-loans") == aggregator_module.RETRY_ATTEMPTS
+    
+    @pytest.mark.asyncio
+    async def test_client_error_is_not_retried(self, site, no_backoff):
+        """Test that a 4xx response other than 429 fails without retrying."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        site.failures["/user-loans"] = [404]
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            books = await aggregator.get_all_checked_out_books()
+        
+        assert account.account_id in books.errors
+        assert site.count("GET", "/user-loans") == 1
+    
+    @pytest.mark.asyncio
+    async def test_login_is_retried(self, site, no_backoff):
+        """Test that a transient error while logging in is retried too."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        site.failures["/mng"] = [503]
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            assert await aggregator.login_all() == {account.account_id: True}
+    
+    @pytest.mark.asyncio
+    async def test_wrong_password_is_not_retried(self, site, no_backoff):
+        """Test that a rejected login is reported as failed after a single attempt."""
+        account = LibraryAccount("shemesh", "user", "wrong")
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            assert await aggregator.login_all() == {account.account_id: False}
+        
+        assert site.count("POST", "/mng") == 1
+
+
+class TestResultCache:
+    """Tests for reusing results with cache_ttl."""
+    
+    @pytest.mark.asyncio
+    async def test_results_are_reused(self, site):
+        """Test that a second call within the TTL makes no requests."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport, cache_ttl=60) as aggregator:
+            await aggregator.login_all()
+            first = await aggregator.get_all_checked_out_books()
+            second = await aggregator.get_all_checked_out_books()
+        
+        assert site.count("GET", "/user-loans") == 1
+        assert second.books == first.books
+    
+    @pytest.mark.asyncio
+    async def test_combined_result_serves_single_views(self, site):
+        """Test that a cached fetch of both views answers the single-view methods."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport, cache_ttl=60) as aggregator:
+            await aggregator.login_all()
+            await aggregator.get_all_books_and_history()
+            books = await aggregator.get_all_checked_out_books()
+            history = await aggregator.get_all_checkout_history()
+        
+        assert site.count("GET", "/user-loans") == 1
+        assert site.count("GET", "/loans-history") == 1
+        assert len(books.books) == 1
+        assert len(history.items) == 1
+    
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, site):
+        """Test that a failed fetch is retried on the next call instead of reused."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        site.failures["/user-loans"] = [404]
+        
+        async with LibraryAggregator([account], transport=site.transport, cache_ttl=60) as aggregator:
+            await aggregator.login_all()
+            failed = await aggregator.get_all_checked_out_books()
+            books = await aggregator.get_all_checked_out_books()
+        
+        assert account.account_id in failed.errors
+        assert books.errors == {}
+        assert len(books.books) == 1
+    
+    @pytest.mark.asyncio
+    async def test_callers_get_their_own_lists(self, site):
+        """Test that modifying a returned result doesn't change the cached one."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport, cache_ttl=60) as aggregator:
+            await aggregator.login_all()
+            first = await aggregator.get_all_checked_out_books()
+            first.books.clear()
+            first.errors["shemesh:other"] = "error"
+            second = await aggregator.get_all_checked_out_books()
+        
+        assert len(second.books) == 1
+        assert second.errors == {}
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_cache(self, site):
+        """Test that invalidate_cache() forces a fresh fetch."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport, cache_ttl=60) as aggregator:
+            await aggregator.login_all()
+            await aggregator.get_all_checked_out_books()
+            aggregator.invalidate_cache()
+            await aggregator.get_all_checked_out_books()
+        
+        assert site.count("GET", "/user-loans") == 2
+
+
+class TestUnexpectedErrors:
+    """Tests for errors that aren't reported per account."""
+    
+    @pytest.mark.asyncio
+    async def test_login_error_is_raised(self, site, monkeypatch):
+        """Test that login_all() raises a bug's exception itself."""
+        async def broken_login(self, username=None, password=None):
+            raise RuntimeError("bug")
+        monkeypatch.setattr(LibraryClient, "login", broken_login)
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            with pytest.raises(RuntimeError, match="bug"):
+                await aggregator.login_all()
+    
+    @pytest.mark.asyncio
+    async def test_fetch_error_is_raised(self, site, monkeypatch):
+        """Test that a bug while fetching is raised instead of reported as an account error."""
+        def broken_parser(self, html):
+            raise RuntimeError("bug")
+        monkeypatch.setattr(LibraryClient, "_parse_loans_page", broken_parser)
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            with pytest.raises(RuntimeError, match="bug"):
+                await aggregator.get_all_books_and_history()
+    
+    @pytest.mark.asyncio
+    async def test_nested_fetch_error_is_not_wrapped(self, site, monkeypatch):
+        """Test that errors from nested task groups are raised as is, not as an ExceptionGroup."""
+        def broken_parser(self, html):
+            raise RuntimeError("bug")
+        monkeypatch.setattr(LibraryClient, "_parse_loans_page", broken_parser)
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            with pytest.raises(RuntimeError, match="bug"):
+                await aggregator.login_and_fetch_all_books()
+
+
+class TestLogin:
+    """Tests for logging in and re-logging in to accounts."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_logins_are_deduplicated(self, site):
+        """Test that concurrent login() calls for one account log in once."""
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            results = await asyncio.gather(*(aggregator.login(account) for _ in range(3)))
+        
+        assert results == [True, True, True]
+        assert site.count("POST", "/mng") == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_log_in_again_once(self, site):
+        """Test that books and history finding the session expired together share one login."""
+        site.delay = 0.01
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            site.expire_sessions()
+            combined = await aggregator.get_all_books_and_history()
+        
+        assert combined.books.errors == {}
+        assert combined.history.errors == {}
+        assert len(combined.books.books) == 1
+        assert len(combined.history.items) == 1
+        assert site.count("POST", "/mng") == 2
+    
+    @pytest.mark.asyncio
+    async def test_late_expired_response_keeps_new_session(self, site):
+        """Test that an expired response arriving after a fresh login doesn't log in again."""
+        site.delay = 0.01
+        # History is sent with the old session, but answered after books logged in again
+        site.path_delays["/loans-history"] = 0.1
+        account = LibraryAccount("shemesh", "user", PASSWORD)
+        
+        async with LibraryAggregator([account], transport=site.transport) as aggregator:
+            await aggregator.login_all()
+            site.expire_sessions()
+            combined = await aggregator.get_all_books_and_history()
+        
+        assert combined.books.errors == {}
+        assert combined.history.errors == {}
+        assert len(combined.history.items) == 1
+        assert site.count("POST", "/mng") == 2
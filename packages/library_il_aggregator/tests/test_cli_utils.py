@@ -0,0 +1,136 @@
+"""Tests for the helpers shared by the library_il_aggregator CLIs.
+
+These tests do NOT require network access or credentials.
+"""
+
+import sys
+
+import pytest
+
+from library_il_aggregator.cli_utils import (
+    load_json_file,
+    render_github_table,
+    render_tsv_table,
+    truncate,
+)
+
+
+class TestTruncate:
+    """Tests for the truncate function used in table output."""
+    
+    def test_short_text_unchanged(self):
+        """Test that text within the limit is returned as is."""
+        assert truncate("short", 10) == "short"
+        assert truncate("exactly10!", 10) == "exactly10!"
+    
+    def test_long_text_truncated(self):
+        """Test that long text is cut to max_len including the suffix."""
+        result = truncate("a" * 20, 10)
+        assert result == "aaaaaaa..."
+        assert len(result) == 10
+    
+    def test_hebrew_text(self):
+        """Test that Hebrew text is truncated by characters."""
+        assert truncate("כראמל הסוף של הסוף", 8) == "כראמל..."
+
+
+class TestRenderGithubTable:
+    """Tests for the render_github_table function."""
+    
+    def test_layout(self):
+        """Test column widths, padding and the separator row."""
+        table = render_github_table(
+            ["Library", "Title"],
+            [["shemesh", "כראמל"], ["betshemesh:parent", "A"]],
+        )
+        assert table.splitlines() == [
+            "| Library           | Title   |",
+            "|-------------------|---------|",
+            "| shemesh           | כראמל   |",
+            "| betshemesh:parent | A       |",
+        ]
+    
+    def test_no_rows(self):
+        """Test that a table without rows still has headers."""
+        assert render_github_table(["A"], []) == "| A   |\n|-----|"
+    
+    def test_integer_columns_right_aligned(self):
+        """Test that columns of integers are right-aligned, as tabulate does."""
+        table = render_github_table(
+            ["Title", "Days Remaining"],
+            [["A", "5"], ["B", "-12"], ["C", ""]],
+        )
+        assert table.splitlines() == [
+            "| Title   |   Days Remaining |",
+            "|---------|------------------|",
+            "| A       |                5 |",
+            "| B       |              -12 |",
+            "| C       |                  |",
+        ]
+    
+    def test_align_numbers_disabled(self):
+        """Test that align_numbers=False leaves integer columns left-aligned."""
+        table = render_github_table(["Shelf"], [["892"]], align_numbers=False)
+        assert table.splitlines() == ["| Shelf   |", "|---------|", "| 892     |"]
+    
+    @pytest.mark.parametrize("wcwidth_installed", [True, False])
+    def test_niqqud_width(self, monkeypatch, wcwidth_installed):
+        """Test that niqqud doesn't count towards a cell's width, with or without wcwidth."""
+        if not wcwidth_installed:
+            # A None entry makes importing the module raise ImportError
+            monkeypatch.setitem(sys.modules, "wcwidth", None)
+        table = render_github_table(["Title"], [["שָׁלוֹם"], ["A"]])
+        assert table.splitlines() == [
+            "| Title   |",
+            "|---------|",
+            "| שָׁלוֹם    |",
+            "| A       |",
+        ]
+    
+    def test_mixed_columns_left_aligned(self):
+        """Test that a column with any non-integer cell stays left-aligned."""
+        table = render_github_table(["Barcode"], [["123"], ["12A"]])
+        assert table.splitlines() == [
+            "| Barcode   |",
+            "|-----------|",
+            "| 123       |",
+            "| 12A       |",
+        ]
+
+
+class TestRenderTsvTable:
+    """Tests for the render_tsv_table function."""
+    
+    def test_layout(self):
+        """Test that cells are tab-separated without padding."""
+        table = render_tsv_table(["Library", "Title"], [["shemesh", "כראמל"]])
+        assert table == "Library\tTitle\nshemesh\tכראמל"
+    
+    def test_tabs_and_newlines_replaced(self):
+        """Test that tabs and newlines in cells don't break the row layout."""
+        table = render_tsv_table(["Title"], [["A\tB\nC"]])
+        assert table.splitlines() == ["Title", "A B C"]
+
+
+class TestLoadJsonFile:
+    """Tests for the load_json_file function used for config files."""
+    
+    def test_loads_accounts(self, tmp_path):
+        """Test loading a config file with Hebrew labels."""
+        path = tmp_path / "accounts.json"
+        path.write_text('[{"slug": "shemesh", "label": "הורה"}]', encoding="utf-8")
+        
+        assert load_json_file(str(path)) == [{"slug": "shemesh", "label": "הורה"}]
+    
+    def test_invalid_json_raises_value_error(self, tmp_path):
+        """Test that invalid JSON raises ValueError."""
+        path = tmp_path / "accounts.json"
+        path.write_text('[{"slug":', encoding="utf-8")
+        
+        with pytest.raises(ValueError):
+            load_json_file(str(path))
+    
+    def test_missing_file_raises(self, tmp_path):
+        """Test that a missing file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            load_json_file(str(tmp_path / "missing.json"))
@@ -0,0 +1,34 @@
+"""Tests for argument parsing in the library-il-copies CLI.
+
+These tests do NOT require network access or credentials.
+"""
+
+import pytest
+
+from library_il_aggregator.copies_cli import parse_slug_id
+
+
+class TestParseSlugId:
+    """Tests for the parse_slug_id function."""
+    
+    def test_colon_separator(self):
+        """Test parsing slug:id."""
+        assert parse_slug_id("shemesh:ABC123") == ("shemesh", "ABC123")
+    
+    def test_slash_separator(self):
+        """Test parsing slug/id."""
+        assert parse_slug_id("shemesh/ABC123") == ("shemesh", "ABC123")
+    
+    def test_splits_on_first_colon(self):
+        """Test that only the first colon separates slug and id."""
+        assert parse_slug_id("shemesh:A:B") == ("shemesh", "A:B")
+    
+    def test_falls_back_to_slash(self):
+        """Test that a slash is used when the colon split has an empty part."""
+        assert parse_slug_id(":x/ABC") == (":x", "ABC")
+    
+    @pytest.mark.parametrize("value", ["shemesh", "shemesh:", ":ABC", "/ABC", ""])
+    def test_invalid_values(self, value):
+        """Test that values without both a slug and an id are rejected."""
+        with pytest.raises(ValueError):
+            parse_slug_id(value)
@@ -0,0 +1,59 @@
+"""Tests for the aggregated data models.
+
+These tests do NOT require network access or credentials.
+"""
+
+from datetime import date
+
+from library_il_client import CheckedOutBook, HistoryItem
+from library_il_aggregator import AggregatedBooks, AggregatedHistory
+
+
+class TestAggregatedBooks:
+    """Tests for AggregatedBooks sorting."""
+    
+    def make_books(self) -> AggregatedBooks:
+        """Create books with ties and a missing due date."""
+        return AggregatedBooks(books=[
+            CheckedOutBook("C", due_date=date(2026, 3, 1)),
+            CheckedOutBook("No due date"),
+            CheckedOutBook("A", due_date=date(2026, 1, 1)),
+            CheckedOutBook("B", due_date=date(2026, 1, 1)),
+        ])
+    
+    def test_sorted_by_due_date(self):
+        """Test that books are sorted by due date, then title, with undated books last."""
+        titles = [book.title for book in self.make_books().sorted_by_due_date()]
+        assert titles == ["A", "B", "C", "No due date"]
+    
+    def test_sorted_by_due_date_with_limit(self):
+        """Test that a limit returns the same books as slicing the full sort."""
+        books = self.make_books()
+        for limit in range(1, 6):
+            assert books.sorted_by_due_date(limit=limit) == books.sorted_by_due_date()[:limit]
+
+
+class TestAggregatedHistory:
+    """Tests for AggregatedHistory sorting."""
+    
+    def make_history(self) -> AggregatedHistory:
+        """Create history items with a missing return date."""
+        return AggregatedHistory(items=[
+            HistoryItem("Old", return_date=date(2024, 5, 1)),
+            HistoryItem("New", return_date=date(2025, 5, 1)),
+            HistoryItem("No return date"),
+            HistoryItem("Newer", return_date=date(2025, 6, 1)),
+        ])
+    
+    def test_sorted_by_return_date(self):
+        """Test that the most recent returns come first by default."""
+        titles = [item.title for item in self.make_history().sorted_by_return_date()]
+        assert titles == ["Newer", "New", "Old", "No return date"]
+    
+    def test_sorted_by_return_date_with_limit(self):
+        """Test that a limit returns the same items as slicing the full sort."""
+        history = self.make_history()
+        for descending in (True, False):
+            full = history.sorted_by_return_date(descending=descending)
+            for limit in range(1, 6):
+                assert history.sorted_by_return_date(descending=descending, limit=limit) == full[:limit]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 import os
 import re
 from datetime import date, datetime
@@ -38,6 +39,24 @@ class SessionExpiredError(LibraryClientError):
     pass
 
 
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that leaves a shared connection pool open on close.
+    
+    The wrapped transport is owned by whoever created it, so several clients
+    can reuse the same connections without closing them for each other.
+    """
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+    
+    async def aclose(self) -> None:
+        # The owner of the shared transport is responsible for closing it
+        pass
+
+
 class LibraryClient:
     """
     Async client for interacting with library.org.il Israeli public library websites.
@@ -74,6 +93,7 @@ class LibraryClient:
         library_slug: str,
         username: Optional[str] = None,
         password: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
     ):
         """
         Initialize the library client.
@@ -82,6 +102,9 @@ class LibraryClient:
             library_slug: The library identifier (e.g., "shemesh" for shemesh.library.org.il)
             username: The username (Teudat Zehut). If not provided, uses TEUDAT_ZEHUT env var.
             password: The password. If not provided, uses LIBRARY_PASSWORD env var.
+            transport: Optional shared HTTP transport (connection pool). The client
+                       keeps its own cookies but sends requests through this transport,
+                       and does not close it. The caller owns the transport.
         """
         self.library_slug = library_slug
         self.base_url = f"https://{library_slug}.library.org.il"
@@ -90,10 +113,14 @@ class LibraryClient:
         self._password = password or os.environ.get("LIBRARY_PASSWORD", "")
         
         self._logged_in = False
+        # Incremented whenever the session changes, so responses to requests
+        # sent with an older session can't mark a newer one as expired
+        self._session = 0
         self._csrf_token: Optional[str] = None
         
         # Create async HTTP client with session management
         self._client = httpx.AsyncClient(
+            transport=_SharedTransport(transport) if transport else None,
             follow_redirects=True,
             timeout=30.0,
             headers={
@@ -234,6 +261,7 @@ class LibraryClient:
         
         if user_loans_link or profile_in_url:
             self._logged_in = True
+            self._session += 1
             self._username = username
             self._password = password
             return True
@@ -250,15 +278,82 @@ class LibraryClient:
         
         # Assume success if we got redirected and no error
         self._logged_in = True
+        self._session += 1
         self._username = username
         self._password = password
         return True
     
+    def save_session(self, path: str | os.PathLike) -> None:
+        """
+        Save the session cookies to a file.
+        
+        A later client can pass the same file to load_session() to reuse the
+        session without logging in again. The file holds session credentials,
+        so it is made readable only by the current user, even if it already
+        existed with wider permissions.
+        
+        Args:
+            path: File to write the cookies to.
+        """
+        cookies = [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+            for c in self._client.cookies.jar
+        ]
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # The mode passed to os.open() only applies when the file is created
+        os.fchmod(fd, 0o600)
+        with open(fd, "w") as f:
+            json.dump(cookies, f)
+    
+    def load_session(self, path: str | os.PathLike) -> bool:
+        """
+        Load session cookies saved by save_session().
+        
+        The client is marked as logged in without contacting the website.
+        If the saved session has expired, data methods raise
+        SessionExpiredError and login() must be called again.
+        
+        Args:
+            path: File previously written by save_session().
+            
+        Returns:
+            True if a saved session was loaded, False if the file is missing or invalid.
+        """
+        try:
+            with open(path) as f:
+                cookies = json.load(f)
+            for cookie in cookies:
+                self._client.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie["domain"],
+                    path=cookie["path"],
+                )
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        
+        self._logged_in = True
+        self._session += 1
+        return True
+    
     def _ensure_logged_in(self) -> None:
         """Ensure the client is logged in, raising an error if not."""
         if not self._logged_in:
             raise LibraryClientError("Not logged in. Call login() first.")
     
+    def _check_session(self, response: httpx.Response, session: int) -> None:
+        """Raise SessionExpiredError if a request was redirected to the login page.
+        
+        Args:
+            response: The response to check.
+            session: The value of self._session when the request was sent. If
+                     the client has logged in again since, it stays logged in.
+        """
+        if "/mng" in str(response.url) and "profile" not in str(response.url):
+            if session == self._session:
+                self._logged_in = False
+            raise SessionExpiredError("Session has expired. Please login again.")
+    
     async def get_checked_out_books(self) -> list[CheckedOutBook]:
         """
         Get the list of currently checked out books.
@@ -272,13 +367,12 @@ class LibraryClient:
         """
         self._ensure_logged_in()
         
+        session = self._session
         response = await self._client.get(urljoin(self.base_url, "/user-loans"))
         response.raise_for_status()
         
         # Check if session expired (redirected to login)
-        if "/mng" in str(response.url) and "profile" not in str(response.url):
-            self._logged_in = False
-            raise SessionExpiredError("Session has expired. Please login again.")
+        self._check_session(response, session)
         
         return self._parse_loans_page(response.text)
     
@@ -539,13 +633,12 @@ class LibraryClient:
         """
         self._ensure_logged_in()
         
+        session = self._session
         response = await self._client.get(urljoin(self.base_url, "/loans-history"))
         response.raise_for_status()
         
         # Check if session expired
-        if "/mng" in str(response.url) and "profile" not in str(response.url):
-            self._logged_in = False
-            raise SessionExpiredError("Session has expired. Please login again.")
+        self._check_session(response, session)
         
         items = self._parse_history_page(response.text)
         
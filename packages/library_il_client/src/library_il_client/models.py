@@ -33,7 +33,7 @@ def normalize_text(text: Optional[str]) -> Optional[str]:
     return normalized if normalized else None
 
 
-@dataclass
+@dataclass(slots=True)
 class CheckedOutBook:
     """Represents a book that is currently checked out."""
     
@@ -45,6 +45,7 @@ class CheckedOutBook:
     due_date: Optional[date] = None
     library_slug: Optional[str] = None
     can_renew: bool = True
+    account_id: Optional[str] = None  # Set by aggregators to the owning account
     
     def __str__(self) -> str:
         due_str = f" (due: {self.due_date})" if self.due_date else ""
@@ -52,7 +53,7 @@ class CheckedOutBook:
         return f"{self.title}{author_str}{due_str}"
 
 
-@dataclass
+@dataclass(slots=True)
 class HistoryItem:
     """Represents a book from checkout history."""
     
@@ -63,6 +64,7 @@ class HistoryItem:
     checkout_date: Optional[date] = None
     return_date: Optional[date] = None
     library_slug: Optional[str] = None
+    account_id: Optional[str] = None  # Set by aggregators to the owning account
     
     def __str__(self) -> str:
         author_str = f" by {self.author}" if self.author else ""
@@ -101,7 +103,7 @@ class PaginatedHistory:
     has_previous: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """Represents a book from search results."""
     
@@ -170,7 +172,7 @@ class SearchResults:
         return self.page > 1
 
 
-@dataclass
+@dataclass(slots=True)
 class BookCopy:
     """Represents a single copy of a book in a library."""
     